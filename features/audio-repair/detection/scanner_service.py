@@ -1,10 +1,18 @@
 import os
 import sys
+import errno
 import time
 import shutil
+import hashlib
 import sqlite3
+import queue
 import logging
+import logging.handlers
+import argparse
+import threading
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import librosa
 from pathlib import Path
@@ -40,21 +48,38 @@ DB_PATH = os.path.join(BASE_DIR, "scan_history.db")
 METADATA_CLI_PATH = os.path.join(PROJECT_ROOT, "features", "audio-repair", "metadata", "cli", "commands.py")
 
 NOISE_THRESHOLD = 0.5 
+INTERPRETER_THREADS = 2  # TFLite kernel threads per interpreter
+SCAN_JOBS = max((os.cpu_count() or 1) // INTERPRETER_THREADS, 1)  # One interpreter per job
+METADATA_TIMEOUT = 300  # Seconds before a metadata repair subprocess is killed
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.wav', '.m4a')
+METADATA_STDERR_LINES = 20  # Trailing stderr lines kept for the failure log
+PREDICT_BATCH_SIZE = 16  # Files per interpreter invoke during the initial scan
+REPAIR_MEMO_BYTES = 1 << 20  # Leading bytes hashed to recognise a file we already failed to repair
 
 # Logging setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - [Scanner] - %(message)s',
-    handlers=[
+def setup_logging(level=logging.INFO):
+    """Route log records through a queue so scan workers never block on file/stdout writes."""
+    formatter = logging.Formatter('%(asctime)s - [Scanner] - %(message)s')
+    handlers = [
         logging.FileHandler("scanner.log", encoding='utf-8'),
         logging.StreamHandler(sys.stdout)
     ]
-)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener.start()
+    return listener
 
 # --- Database ---
 class Database:
     def __init__(self):
         self.conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
         self.create_table()
 
     def create_table(self):
@@ -68,22 +93,82 @@ class Database:
                 noise_score REAL,
                 scan_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 metadata_status TEXT,
-                repair_status TEXT
+                repair_status TEXT,
+                mtime_ns INTEGER,
+                size INTEGER
+            )
+        ''')
+        # Databases created before files were keyed by (mtime, size)
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(scans)")}
+        for column in ("mtime_ns", "size"):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE scans ADD COLUMN {column} INTEGER")
+        # Repair outcomes by content, so a re-downloaded copy of a file that
+        # could not be repaired is not sent through the repair again
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS repair_memo (
+                content_key TEXT PRIMARY KEY,
+                outcome TEXT,
+                repair_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         self.conn.commit()
 
+    @staticmethod
+    def content_key(filepath):
+        """Hash of the first REPAIR_MEMO_BYTES plus the size, or None if unreadable."""
+        try:
+            with open(filepath, 'rb') as f:
+                digest = hashlib.blake2b(f.read(REPAIR_MEMO_BYTES), digest_size=16)
+                size = os.fstat(f.fileno()).st_size
+        except OSError:
+            return None
+        return f"{digest.hexdigest()}_{size}"
+
+    def repair_outcome(self, content_key):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT outcome FROM repair_memo WHERE content_key = ?", (content_key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def record_repair(self, content_key, outcome):
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO repair_memo (content_key, outcome) VALUES (?, ?)",
+                (content_key, outcome)
+            )
+            self.conn.commit()
+        except Exception as e:
+            logging.error(f"DB Update failed: {e}")
+
+    @staticmethod
+    def file_signature(filepath):
+        """(mtime_ns, size) of a file, or None if it cannot be read."""
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
     def is_scanned(self, filepath):
+        # A file counts as scanned only if it is unchanged since its scan
+        signature = self.file_signature(filepath)
+        if signature is None:
+            return False
         cursor = self.conn.cursor()
-        cursor.execute("SELECT id FROM scans WHERE filepath = ?", (filepath,))
+        cursor.execute(
+            "SELECT id FROM scans WHERE filepath = ? AND mtime_ns = ? AND size = ?",
+            (filepath, *signature)
+        )
         return cursor.fetchone() is not None
 
     def add_result(self, filepath, is_clean, score):
+        mtime_ns, size = self.file_signature(filepath) or (None, None)
         try:
             cursor = self.conn.cursor()
             cursor.execute(
-                "INSERT INTO scans (filename, filepath, is_clean, noise_score, metadata_status, repair_status) VALUES (?, ?, ?, ?, ?, ?)",
-                (os.path.basename(filepath), filepath, 1 if is_clean else 0, score, "PENDING", "NONE")
+                "INSERT OR REPLACE INTO scans (filename, filepath, is_clean, noise_score, metadata_status, repair_status, mtime_ns, size) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.basename(filepath), filepath, 1 if is_clean else 0, score, "PENDING", "NONE", mtime_ns, size)
             )
             self.conn.commit()
         except sqlite3.IntegrityError:
@@ -92,8 +177,14 @@ class Database:
     def update_status(self, filepath, col, status):
         try:
             cursor = self.conn.cursor()
-            query = f"UPDATE scans SET {col} = ? WHERE filepath = ?"
-            cursor.execute(query, (status, filepath))
+            signature = self.file_signature(filepath)
+            if signature:
+                # Our own tag writes change the file; don't rescan it for that
+                query = f"UPDATE scans SET {col} = ?, mtime_ns = ?, size = ? WHERE filepath = ?"
+                cursor.execute(query, (status, *signature, filepath))
+            else:
+                query = f"UPDATE scans SET {col} = ? WHERE filepath = ?"
+                cursor.execute(query, (status, filepath))
             self.conn.commit()
         except Exception as e:
             logging.error(f"DB Update failed: {e}")
@@ -105,15 +196,53 @@ class AudioPredictor:
             raise FileNotFoundError(f"Model not found at {model_path}")
         
         logging.info("Loading AI Model...")
-        self.interpreter = tflite.Interpreter(model_path=model_path)
-        self.interpreter.allocate_tensors()
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
+        self.model_path = model_path
+        # Built once instead of inside every librosa.feature.melspectrogram call
+        self.mel_basis = librosa.filters.mel(sr=22050, n_fft=2048, n_mels=128)
+        # An interpreter runs one invoke at a time, so each scan thread gets
+        # its own and graphs execute side by side instead of queueing
+        self._local = threading.local()
+        self._runner()
+
+    def _runner(self):
+        """Return this thread's interpreter state, loading it on first use."""
+        local = self._local
+        if not hasattr(local, 'interpreter'):
+            local.interpreter = tflite.Interpreter(model_path=self.model_path, num_threads=INTERPRETER_THREADS)
+            local.interpreter.allocate_tensors()
+            local.input_details = local.interpreter.get_input_details()
+            local.output_details = local.interpreter.get_output_details()
+        return local
+
+    @property
+    def interpreter(self):
+        return self._runner().interpreter
+
+    @staticmethod
+    def _to_model_input(detail, data):
+        """Quantize float spectrograms for int8/uint8 models; float models take them as-is."""
+        if detail['dtype'] == np.float32: return data
+        scale, zero_point = detail['quantization']
+        info = np.iinfo(detail['dtype'])
+        return np.clip(np.round(data / scale + zero_point), info.min, info.max).astype(detail['dtype'])
+
+    @staticmethod
+    def _from_model_output(detail, output):
+        if detail['dtype'] == np.float32: return output
+        scale, zero_point = detail['quantization']
+        return (output.astype(np.float32) - zero_point) * scale
 
     def preprocess(self, file_path):
         try:
             duration = 3.0
-            y, sr = librosa.load(file_path, sr=22050, duration=10.0)
+            try:
+                # Decode only the centre window of the first 10s, located
+                # from the header instead of decoding all 10s and slicing
+                total = min(librosa.get_duration(path=file_path), 10.0)
+                offset = max((total - duration) / 2, 0.0)
+                y, sr = librosa.load(file_path, sr=22050, offset=offset, duration=duration)
+            except Exception:
+                y, sr = librosa.load(file_path, sr=22050, duration=10.0)
             target_len = int(22050 * duration)
             
             if len(y) > target_len:
@@ -122,26 +251,50 @@ class AudioPredictor:
             elif len(y) < target_len:
                 y = np.pad(y, (0, target_len - len(y)))
 
-            mel = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=128)
+            mel = self.mel_basis @ (np.abs(librosa.stft(y, n_fft=2048, hop_length=512)) ** 2)
             mel_db = librosa.power_to_db(mel, ref=np.max)
             min_val, max_val = mel_db.min(), mel_db.max()
             if max_val - min_val == 0: return None
-            mel_norm = (mel_db - min_val) / (max_val - min_val)
+            # In place: no temporaries for the 128x130 matrix
+            mel_db -= min_val
+            mel_db /= max_val - min_val
             
-            if mel_norm.shape[1] > 128: mel_norm = mel_norm[:, :128]
-            else: mel_norm = np.pad(mel_norm, ((0,0), (0, 128 - mel_norm.shape[1])))
+            if mel_db.shape[1] > 128: mel_db = mel_db[:, :128]
+            else: mel_db = np.pad(mel_db, ((0,0), (0, 128 - mel_db.shape[1])))
             
-            return mel_norm[np.newaxis, ..., np.newaxis].astype(np.float32)
+            return mel_db[np.newaxis, ..., np.newaxis].astype(np.float32)
         except Exception as e:
             logging.error(f"Preprocessing error: {e}")
             return None
 
     def predict(self, file_path):
-        input_data = self.preprocess(file_path)
-        if input_data is None: return 1.0
-        self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
-        self.interpreter.invoke()
-        return float(self.interpreter.get_tensor(self.output_details[0]['index'])[0][0])
+        # Goes through predict_batch so a thread's interpreter that was resized
+        # for a batch is resized back to 1 instead of rejecting the input
+        return self.predict_batch([file_path])[0]
+
+    def predict_batch(self, file_paths):
+        """Score several files with one invoke; unreadable files score 1.0 like predict()."""
+        inputs = [self.preprocess(path) for path in file_paths]
+        scores = [1.0] * len(file_paths)
+        ready = [i for i, data in enumerate(inputs) if data is not None]
+        if not ready: return scores
+
+        batch = np.concatenate([inputs[i] for i in ready])
+        runner = self._runner()
+        input_index = runner.input_details[0]['index']
+        # Resizing reallocates the graph's tensors, so only do it when N changes
+        if runner.input_details[0]['shape'][0] != len(batch):
+            runner.interpreter.resize_tensor_input(input_index, batch.shape)
+            runner.interpreter.allocate_tensors()
+            runner.input_details = runner.interpreter.get_input_details()
+            runner.output_details = runner.interpreter.get_output_details()
+        input_detail, output_detail = runner.input_details[0], runner.output_details[0]
+        runner.interpreter.set_tensor(input_index, self._to_model_input(input_detail, batch))
+        runner.interpreter.invoke()
+        output = self._from_model_output(output_detail, runner.interpreter.get_tensor(output_detail['index']))
+        for i, score in zip(ready, output[:, 0]):
+            scores[i] = float(score)
+        return scores
 
 # --- Subprocess Integration ---
 def run_metadata_repair(file_path):
@@ -159,16 +312,46 @@ def run_metadata_repair(file_path):
     cmd = [sys.executable, script_name, os.path.abspath(file_path), "--write", "--backup"]
 
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', cwd=cli_dir, env=env)
-        if result.returncode == 0:
-            logging.info(f"[METADATA] Success!")
-            return True
-        else:
-            logging.warning(f"[METADATA] Process failed: {result.stderr.strip()}")
-            return False
+        # Stream stderr instead of buffering it; only the tail is worth logging,
+        # so lines stay bytes and are decoded on the failure path alone
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.PIPE, cwd=cli_dir, env=env)
+    except Exception as e:
+        logging.error(f"[METADATA] Error: {e}")
+        return False
+
+    # A hung process would otherwise hold one of the scan workers forever
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(METADATA_TIMEOUT, kill)
+    timer.start()
+    tail = deque(maxlen=METADATA_STDERR_LINES)
+    try:
+        with proc.stderr:
+            for line in proc.stderr:
+                tail.append(line)
+        returncode = proc.wait()
     except Exception as e:
+        proc.kill()
+        proc.wait()
         logging.error(f"[METADATA] Error: {e}")
         return False
+    finally:
+        timer.cancel()
+
+    if timed_out.is_set():
+        logging.error(f"[METADATA] Timed out after {METADATA_TIMEOUT}s: {os.path.basename(file_path)}")
+        return False
+    if returncode == 0:
+        logging.info(f"[METADATA] Success!")
+        return True
+    stderr = b"".join(tail).decode('utf-8', 'replace').strip()
+    logging.warning(f"[METADATA] Process failed: {stderr}")
+    return False
 
 # --- Watchdog Handler ---
 class NewFileHandler(FileSystemEventHandler):
@@ -176,18 +359,22 @@ class NewFileHandler(FileSystemEventHandler):
         self.db = db
         self.predictor = predictor
         self.repair_service = repair_service
+        # The shared DB connection is not thread-safe; prediction runs on a
+        # per-thread interpreter and the metadata subprocess needs no lock
+        self._lock = threading.Lock()
 
     def on_created(self, event):
         if event.is_directory: return
         filename = event.src_path
-        if not filename.lower().endswith(('.mp3', '.flac', '.wav', '.m4a')): return
+        if not filename.lower().endswith(AUDIO_EXTENSIONS): return
         time.sleep(1) 
         self.process_file(filename)
 
     def process_file(self, filepath):
-        if self.db.is_scanned(filepath):
-            logging.info(f"Skipping known: {os.path.basename(filepath)}")
-            return
+        with self._lock:
+            if self.db.is_scanned(filepath):
+                logging.debug(f"Skipping known: {os.path.basename(filepath)}")
+                return
 
         logging.info(f"🔍 Analyzing: {os.path.basename(filepath)}...")
         
@@ -197,21 +384,63 @@ class NewFileHandler(FileSystemEventHandler):
         
         status_msg = '[CLEAN]' if is_clean else '[DIRTY]'
         logging.info(f"   Score: {score:.4f} | Status: {status_msg}")
-        self.db.add_result(filepath, is_clean, score)
+        with self._lock:
+            self.db.add_result(filepath, is_clean, score)
+
+        self.handle_result(filepath, is_clean)
+
+    def process_batch(self, filepaths):
+        """Like process_file for several files, scored with a single model invoke."""
+        with self._lock:
+            pending = []
+            for filepath in filepaths:
+                if self.db.is_scanned(filepath):
+                    logging.debug(f"Skipping known: {os.path.basename(filepath)}")
+                else:
+                    pending.append(filepath)
+        if not pending: return
+
+        logging.info(f"🔍 Analyzing {len(pending)} files...")
+        
+        # 1. AI Analysis
+        results = []
+        for filepath, score in zip(pending, self.predictor.predict_batch(pending)):
+            is_clean = score < NOISE_THRESHOLD
+            status_msg = '[CLEAN]' if is_clean else '[DIRTY]'
+            logging.info(f"   {os.path.basename(filepath)} Score: {score:.4f} | Status: {status_msg}")
+            results.append((filepath, is_clean, score))
+
+        with self._lock:
+            for filepath, is_clean, score in results:
+                self.db.add_result(filepath, is_clean, score)
 
+        for filepath, is_clean, _ in results:
+            self.handle_result(filepath, is_clean)
+
+    def handle_result(self, filepath, is_clean):
         # 2. Decision Logic
         if is_clean:
-            # Happy Path: Metadata Repair
-            if run_metadata_repair(filepath):
-                self.db.update_status(filepath, "metadata_status", "COMPLETED")
-            else:
-                self.db.update_status(filepath, "metadata_status", "FAILED")
+            # Happy Path: Metadata Repair (a subprocess, so files overlap here)
+            status = "COMPLETED" if run_metadata_repair(filepath) else "FAILED"
+            with self._lock:
+                self.db.update_status(filepath, "metadata_status", status)
         else:
             # Dirty Path: Quarantine -> Repair
-            self.db.update_status(filepath, "repair_status", "NEEDED")
+            with self._lock:
+                self.db.update_status(filepath, "repair_status", "NEEDED")
             quarantined_path = self.move_to_quarantine(filepath)
             
             if quarantined_path and self.repair_service:
+                content_key = self.db.content_key(quarantined_path)
+                with self._lock:
+                    known_outcome = self.db.repair_outcome(content_key) if content_key else None
+                if known_outcome == "UNFIXABLE":
+                    # Same bytes failed before; a second ffmpeg run would fail the same way
+                    logging.warning(f"   Skipping repair, already unfixable: {os.path.basename(quarantined_path)}")
+                    with self._lock:
+                        self.db.update_status(filepath, "repair_status", "UNFIXABLE")
+                    return
+
                 logging.info(f"🚑 Attempting Auto-Repair on: {os.path.basename(quarantined_path)}")
                 
                 # הפעלת תיקון (FFmpeg Denoiser)
@@ -220,16 +449,27 @@ class NewFileHandler(FileSystemEventHandler):
                 
                 if repaired_file:
                     logging.info(f"✨ Repair Done! New file returned to cycle: {os.path.basename(repaired_file)}")
-                    self.db.update_status(filepath, "repair_status", "FIXED")
+                    status = "FIXED"
                 else:
                     logging.error("❌ Repair failed.")
-                    self.db.update_status(filepath, "repair_status", "UNFIXABLE")
+                    status = "UNFIXABLE"
+                with self._lock:
+                    self.db.update_status(filepath, "repair_status", status)
+                    if content_key:
+                        self.db.record_repair(content_key, status)
 
     def move_to_quarantine(self, filepath):
         try:
             if not os.path.exists(QUARANTINE_DIR): os.makedirs(QUARANTINE_DIR)
             dest = os.path.join(QUARANTINE_DIR, os.path.basename(filepath))
-            shutil.move(filepath, dest)
+            try:
+                os.replace(filepath, dest)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                # Quarantine on another mount: kernel-side copy, then drop the original
+                shutil.copy2(filepath, dest)
+                os.unlink(filepath)
             logging.warning(f"   [MOVED] To Quarantine: {dest}")
             return dest
         except Exception as e:
@@ -238,6 +478,14 @@ class NewFileHandler(FileSystemEventHandler):
 
 # --- Main ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch the downloads folder and scan new audio files")
+    parser.add_argument("--jobs", type=int, default=SCAN_JOBS,
+                        help="Files processed concurrently during the initial scan (one interpreter each)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Also log files skipped as already scanned")
+    args = parser.parse_args()
+    log_listener = setup_logging(logging.DEBUG if args.verbose else logging.INFO)
+
     for d in [WATCH_DIR, QUARANTINE_DIR]: os.makedirs(d, exist_ok=True)
 
     db = Database()
@@ -246,6 +494,7 @@ if __name__ == "__main__":
         predictor = AudioPredictor(MODEL_PATH)
     except Exception as e:
         logging.critical(f"AI Model Error: {e}")
+        log_listener.stop()
         exit(1)
 
     # Init Repair Service
@@ -267,11 +516,20 @@ if __name__ == "__main__":
     logging.info(f"   Watching: {WATCH_DIR}")
     
     # Initial Scan
-    logging.info("--- Initial Scan ---")
-    for root, dirs, files in os.walk(WATCH_DIR):
-        for file in files:
-            if file.lower().endswith(('.mp3', '.flac', '.wav', '.m4a')):
-                event_handler.process_file(os.path.join(root, file))
+    logging.info(f"--- Initial Scan ({args.jobs} jobs) ---")
+    pending = [
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(WATCH_DIR)
+        for file in files
+        if file.lower().endswith(AUDIO_EXTENSIONS)
+    ]
+    batches = [pending[i:i + PREDICT_BATCH_SIZE] for i in range(0, len(pending), PREDICT_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for future in [pool.submit(event_handler.process_batch, batch) for batch in batches]:
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"Initial scan failed for a batch: {e}")
 
     observer.start()
     try:
@@ -279,4 +537,5 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         observer.stop()
         logging.info("Scanner Stopped.")
-    observer.join()
\ No newline at end of file
+    observer.join()
+    log_listener.stop()
\ No newline at end of file
@@ -9,8 +9,14 @@ from typing import Dict, Any
 MUSICBRAINZ_CONFIG = {
     'base_url': 'https://musicbrainz.org/ws/2/',
     'user_agent': 'AudiophileNAS/1.0 (https://github.com/danshani/AudiophileNAS)',
-    'rate_limit': 1.0,  # Requests per second
+    'rate_limit': 1.0,  # Requests per second (long-run average)
+    'rate_limit_burst': 10,  # Requests allowed back-to-back before throttling
     'timeout': 10,  # Request timeout in seconds
+    'cache_path': os.path.join(os.path.expanduser('~'), '.cache', 'AudiophileNAS', 'musicbrainz_cache.db'),
+    'cache_ttl': 7 * 24 * 3600,  # Search results, in seconds
+    'lookup_cache_ttl': 30 * 24 * 3600,  # Lookups by MusicBrainz ID, in seconds
+    'negative_cache_ttl': 24 * 3600,  # Searches that found nothing, in seconds
+    'refresh_negatives': False,  # Re-run cached searches that found nothing
 }
 
 # Metadata completion settings
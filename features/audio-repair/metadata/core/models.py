@@ -2,13 +2,13 @@
 Data models for metadata processing.
 """
 
-from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, field, fields
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioFileInfo:
     """Information about an audio file."""
     file_path: Path
@@ -21,7 +21,7 @@ class AudioFileInfo:
     bits_per_sample: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioMetadata:
     """Complete audio metadata model."""
     # Core metadata fields
@@ -61,14 +61,15 @@ class AudioMetadata:
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         result = {}
-        for field_name, field_value in self.__dict__.items():
+        for field_name in self.__dataclass_fields__:
+            field_value = getattr(self, field_name)
             if field_value is not None:
                 if isinstance(field_value, Path):
                     result[field_name] = str(field_value)
                 elif isinstance(field_value, datetime.datetime):
                     result[field_name] = field_value.isoformat()
                 elif isinstance(field_value, AudioFileInfo):
-                    result['file_info'] = field_value.__dict__.copy()
+                    result['file_info'] = {f.name: getattr(field_value, f.name) for f in fields(field_value)}
                     if 'file_path' in result['file_info']:
                         result['file_info']['file_path'] = str(result['file_info']['file_path'])
                 else:
@@ -112,6 +113,14 @@ class AudioMetadata:
         """Check if metadata is complete."""
         return len(self.get_missing_fields(required_fields)) == 0
     
+    def scoring_fields(self) -> Tuple[str, str, str]:
+        """Lowercased title, artist and album for similarity scoring ("" if missing)."""
+        return (
+            self.title.lower() if self.title else "",
+            self.artist.lower() if self.artist else "",
+            self.album.lower() if self.album else "",
+        )
+    
     def merge(self, other: 'AudioMetadata', prefer_existing: bool = True) -> 'AudioMetadata':
         """Merge with another metadata object."""
         merged = AudioMetadata()
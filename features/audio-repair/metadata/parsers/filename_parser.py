@@ -16,6 +16,47 @@ from ..core.models import AudioMetadata
 
 logger = logging.getLogger(__name__)
 
+# Audio extensions that may survive os.path.splitext on double-suffixed names
+AUDIO_EXTENSIONS = ('.flac', '.mp3', '.wav', '.m4a', '.ogg')
+
+# Helper patterns used on every parsed name, compiled once
+LEADING_NUMBER_RE = re.compile(r'^(\d+)')
+LEADING_TRACK_RE = re.compile(r'^\d+[\s\.\-_]*')
+TRACK_PREFIX_RE = re.compile(r'^\d+[\.\s]*')
+WHITESPACE_RE = re.compile(r'\s+')
+EDGE_PUNCTUATION_RE = re.compile(r'^[\-\.\s]+|[\-\.\s]+$')
+ARTIST_2000_RE = re.compile(r'\s*2000\s*')
+BRACKETED_RE = re.compile(r'[\[\(]([^[\]()]+)[\]\)]')
+YEAR_RE = re.compile(r'^\d{4}$')
+
+# Common character encoding corruptions found in filenames
+# Based on analysis: ä (U+00E4) becomes Г (U+0413) + ¤ (U+00A4)
+MOJIBAKE_FIXES = {
+    'Г¤': 'ä',  # ä (a-umlaut) - confirmed pattern
+    'Г¶': 'ö',  # ö (o-umlaut) 
+    'Г¼': 'ü',  # ü (u-umlaut)
+    'Г„': 'Ä',  # Ä (A-umlaut)
+    'Г–': 'Ö',  # Ö (O-umlaut)
+    'Гњ': 'Ü',  # Ü (U-umlaut)
+    'ГџÂ': 'ß', # ß (sharp s)
+    'Гџ': 'ß',  # ß (sharp s)
+    'Г©': 'é',  # é (e-acute)
+    'Г¡': 'á',  # á (a-acute) 
+    'Г­': 'í',  # í (i-acute)
+    'Гі': 'ó',  # ó (o-acute)
+    'Гє': 'ú',  # ú (u-acute)
+    'Г±': 'ñ',  # ñ (n-tilde)
+    'Г§': 'ç',  # ç (c-cedilla)
+    'â€™': "'", # right single quotation mark
+    'â€œ': '"', # left double quotation mark
+    'â€': '"',  # right double quotation mark
+    'â€"': '–', # en dash
+    'â€"': '—', # em dash
+}
+# One pass over the name; alternatives keep dict order, so overlapping
+# sequences resolve exactly as the old replace-in-order loop did
+MOJIBAKE_RE = re.compile('|'.join(re.escape(k) for k in MOJIBAKE_FIXES))
+
 class FilenameParser(MetadataParserInterface):
     """Parse metadata from audio filenames."""
     
@@ -40,6 +81,35 @@ class FilenameParser(MetadataParserInterface):
             # Pattern: "Track Number. Track Name.ext" 
             r'^(\d+)\.[\s]*(.+?)(?:\.[^.]+)?$',
         ]
+        
+        # Metadata field for each capture group, indexed like self.patterns
+        self.pattern_fields = [
+            ('track_number', 'artist', 'title'),
+            ('title', 'artist'),
+            ('artist', 'album', 'title'),
+            ('artist', 'title', 'album'),
+            ('track_number', 'artist', 'title'),
+            ('track_number', 'title'),
+        ]
+        self._compile_patterns()
+    
+    def _compile_patterns(self):
+        """Compile the filename patterns into a single alternation."""
+        # Alternation tries branches in order, so the first branch that matches
+        # is the same pattern the sequential loop would have picked.
+        self._combined_pattern = re.compile(
+            '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(self.patterns)),
+            re.IGNORECASE,
+        )
+        
+        # Map each branch to the slice of combined groups holding its own groups
+        self._group_slices = []
+        offset = 0
+        for pattern in self.patterns:
+            group_count = re.compile(pattern).groups
+            start = offset + 1  # skip the named wrapper group
+            self._group_slices.append(slice(start, start + group_count))
+            offset = start + group_count
     
     def parse(self, source: Any) -> Optional[AudioMetadata]:
         """Parse metadata from filename."""
@@ -69,14 +139,14 @@ class FilenameParser(MetadataParserInterface):
         
         logger.debug(f"Parsing filename: {filename}")
         
-        # Try each pattern
-        for i, pattern in enumerate(self.patterns):
-            match = re.match(pattern, name_without_ext, re.IGNORECASE)
-            if match:
-                metadata = self._extract_metadata_from_match(match, i, name_without_ext)
-                if metadata:
-                    logger.info(f"Parsed filename '{filename}' using pattern {i+1}: {metadata}")
-                    return metadata
+        # Match all patterns in one pass; the named branch tells which one hit
+        match = self._combined_pattern.match(name_without_ext)
+        if match:
+            index = int(match.lastgroup[1:])
+            groups = match.groups()[self._group_slices[index]]
+            metadata = self._extract_metadata_from_match(groups, index, name_without_ext)
+            logger.info(f"Parsed filename '{filename}' using pattern {index+1}: {metadata}")
+            return metadata
         
         # If no pattern matches, try to extract basic info
         basic_metadata = self._extract_basic_metadata(name_without_ext)
@@ -87,49 +157,27 @@ class FilenameParser(MetadataParserInterface):
         logger.warning(f"Could not parse metadata from filename: {filename}")
         return None
     
-    def _extract_metadata_from_match(self, match, pattern_index: int, filename: str) -> Optional[AudioMetadata]:
-        """Extract metadata based on the matched pattern."""
-        groups = match.groups()
-        metadata = AudioMetadata(source="filename")
+    def parse_many(self, filepaths: List[Any]) -> List[Optional[AudioMetadata]]:
+        """
+        Parse metadata from many filenames.
         
-        try:
-            if pattern_index == 0:  # "01 Artist_-_Track.ext"
-                track_num, artist, title = groups
-                metadata.track_number = track_num.strip().zfill(2)
-                metadata.artist = self._clean_text(artist)
-                metadata.title = self._clean_text(title)
-                
-            elif pattern_index == 1:  # "Track - Artist.ext"
-                title, artist = groups
-                metadata.title = self._clean_text(title)
-                metadata.artist = self._clean_text(artist)
-                
-            elif pattern_index == 2:  # "Artist - Album - Track.ext"
-                artist, album, title = groups
-                metadata.artist = self._clean_text(artist)
-                metadata.album = self._clean_text(album)
-                metadata.title = self._clean_text(title)
-                
-            elif pattern_index == 3:  # "Artist - Track (Album).ext"
-                artist, title, album = groups
-                metadata.artist = self._clean_text(artist)
-                metadata.title = self._clean_text(title)
-                metadata.album = self._clean_text(album)
-                
-            elif pattern_index == 4:  # "Track Number - Artist - Track Name.ext"
-                track_num, artist, title = groups
-                metadata.track_number = track_num.strip().zfill(2)
-                metadata.artist = self._clean_text(artist)
-                metadata.title = self._clean_text(title)
-                
-            elif pattern_index == 5:  # "Track Number. Track Name.ext"
-                track_num, title = groups
-                metadata.track_number = track_num.strip().zfill(2)
-                metadata.title = self._clean_text(title)
+        Args:
+            filepaths: Paths or filenames to parse
+            
+        Returns:
+            AudioMetadata (or None) for each input, in order
+        """
+        return [self.parse_filename(filepath) for filepath in filepaths]
+    
+    def _extract_metadata_from_match(self, groups: tuple, pattern_index: int, filename: str) -> AudioMetadata:
+        """Extract metadata from the groups captured by the matched pattern."""
+        metadata = AudioMetadata(source="filename")
         
-        except (IndexError, ValueError) as e:
-            logger.warning(f"Error extracting metadata from pattern {pattern_index}: {e}")
-            return None
+        for field_name, value in zip(self.pattern_fields[pattern_index], groups):
+            if field_name == 'track_number':
+                metadata.track_number = value.strip().zfill(2)
+            else:
+                setattr(metadata, field_name, self._clean_text(value))
         
         # Additional processing for special cases
         metadata = self._post_process_metadata(metadata, filename)
@@ -141,11 +189,11 @@ class FilenameParser(MetadataParserInterface):
         metadata = AudioMetadata(source="filename")
         
         # Try to extract track number from beginning
-        track_match = re.match(r'^(\d+)', filename)
+        track_match = LEADING_NUMBER_RE.match(filename)
         if track_match:
             metadata.track_number = track_match.group(1).zfill(2)
             # Remove track number from filename for title
-            remaining = re.sub(r'^\d+[\s\.\-_]*', '', filename)
+            remaining = LEADING_TRACK_RE.sub('', filename)
             if remaining:
                 metadata.title = self._clean_text(remaining)
         else:
@@ -166,44 +214,16 @@ class FilenameParser(MetadataParserInterface):
         text = text.replace('_-_', ' - ').replace('_', ' ').replace('--', '-')
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = WHITESPACE_RE.sub(' ', text).strip()
         
         # Remove leading/trailing dashes and dots
-        text = re.sub(r'^[\-\.\s]+|[\-\.\s]+$', '', text)
+        text = EDGE_PUNCTUATION_RE.sub('', text)
         
         return text
     
     def _fix_character_encoding(self, text: str) -> str:
         """Fix common character encoding corruptions in filenames."""
-        # Common character encoding corruptions found in filenames
-        # Based on analysis: ä (U+00E4) becomes Г (U+0413) + ¤ (U+00A4)
-        corruptions = {
-            'Г¤': 'ä',  # ä (a-umlaut) - confirmed pattern
-            'Г¶': 'ö',  # ö (o-umlaut) 
-            'Г¼': 'ü',  # ü (u-umlaut)
-            'Г„': 'Ä',  # Ä (A-umlaut)
-            'Г–': 'Ö',  # Ö (O-umlaut)
-            'Гњ': 'Ü',  # Ü (U-umlaut)
-            'ГџÂ': 'ß', # ß (sharp s)
-            'Гџ': 'ß',  # ß (sharp s)
-            'Г©': 'é',  # é (e-acute)
-            'Г¡': 'á',  # á (a-acute) 
-            'Г­': 'í',  # í (i-acute)
-            'Гі': 'ó',  # ó (o-acute)
-            'Гє': 'ú',  # ú (u-acute)
-            'Г±': 'ñ',  # ñ (n-tilde)
-            'Г§': 'ç',  # ç (c-cedilla)
-            'â€™': "'", # right single quotation mark
-            'â€œ': '"', # left double quotation mark
-            'â€': '"',  # right double quotation mark
-            'â€"': '–', # en dash
-            'â€"': '—', # em dash
-        }
-        
-        for corrupted, correct in corruptions.items():
-            text = text.replace(corrupted, correct)
-        
-        return text
+        return MOJIBAKE_RE.sub(lambda m: MOJIBAKE_FIXES[m.group()], text)
     
     def _post_process_metadata(self, metadata: AudioMetadata, filename: str) -> AudioMetadata:
         """Post-process extracted metadata for better results."""
@@ -212,25 +232,29 @@ class FilenameParser(MetadataParserInterface):
         if metadata.artist:
             artist = metadata.artist
             # Fix common formatting issues
-            artist = re.sub(r'\s*2000\s*', ' 2000', artist)  # Normalize "Shiwa2000" to "Shiwa 2000"
+            artist = ARTIST_2000_RE.sub(' 2000', artist)  # Normalize "Shiwa2000" to "Shiwa 2000"
             metadata.artist = artist.strip()
         
         # Handle special title formatting
         if metadata.title:
             title = metadata.title
             # Remove file format indicators
-            title = re.sub(r'\.(flac|mp3|wav|m4a|ogg)$', '', title, re.IGNORECASE)
+            lowered = title.lower()
+            for ext in AUDIO_EXTENSIONS:
+                if lowered.endswith(ext):
+                    title = title[:-len(ext)]
+                    break
             metadata.title = title.strip()
         
         # Try to extract additional info from complex filenames
         if metadata.artist and metadata.title:
             # Look for album info in parentheses or brackets
             full_text = filename
-            album_match = re.search(r'[\[\(]([^[\]()]+)[\]\)]', full_text)
+            album_match = BRACKETED_RE.search(full_text)
             if album_match and not metadata.album:
                 potential_album = self._clean_text(album_match.group(1))
                 # Only use if it doesn't look like year or format info
-                if not re.match(r'^\d{4}$', potential_album) and potential_album.lower() not in ['flac', 'mp3', 'wav']:
+                if not YEAR_RE.match(potential_album) and potential_album.lower() not in ['flac', 'mp3', 'wav']:
                     metadata.album = potential_album
         
         return metadata
@@ -249,7 +273,7 @@ class FilenameParser(MetadataParserInterface):
         name_without_ext = os.path.splitext(filename)[0]
         
         # Check if filename has structured information
-        has_track_number = bool(re.match(r'^\d+', name_without_ext))
+        has_track_number = bool(LEADING_NUMBER_RE.match(name_without_ext))
         has_separators = any(sep in name_without_ext for sep in ['-', '_', ' - '])
         has_reasonable_length = len(name_without_ext) > 5
         
@@ -271,7 +295,7 @@ class FilenameParser(MetadataParserInterface):
         if 'artist' in normalized:
             artist = normalized['artist']
             # Common normalizations
-            artist = re.sub(r'\s+', ' ', artist)  # Multiple spaces to single
+            artist = WHITESPACE_RE.sub(' ', artist)  # Multiple spaces to single
             artist = artist.strip()
             normalized['artist'] = artist
         
@@ -279,8 +303,8 @@ class FilenameParser(MetadataParserInterface):
         if 'title' in normalized:
             title = normalized['title']
             # Remove common prefixes/suffixes that might interfere with search
-            title = re.sub(r'^\d+[\.\s]*', '', title)  # Remove track number prefix
-            title = re.sub(r'\s+', ' ', title).strip()
+            title = TRACK_PREFIX_RE.sub('', title)  # Remove track number prefix
+            title = WHITESPACE_RE.sub(' ', title).strip()
             normalized['title'] = title
         
         return normalized
\ No newline at end of file
@@ -3,16 +3,16 @@ Metadata parser implementing the MetadataExtractorInterface.
 """
 
 import logging
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Dict, List, Any
 
 try:
+    # Only the polyglot mutagen.File loader is used; it imports the
+    # per-format modules itself when a file is actually opened.
     import mutagen
-    from mutagen.flac import FLAC
-    from mutagen.mp3 import MP3
-    from mutagen.mp4 import MP4
-    from mutagen.oggvorbis import OggVorbis
-    from mutagen.wave import WAVE
     MUTAGEN_AVAILABLE = True
 except ImportError:
     MUTAGEN_AVAILABLE = False
@@ -23,6 +23,9 @@ from ..core.exceptions import FileProcessingError
 
 logger = logging.getLogger(__name__)
 
+# Parsed mutagen files kept for reuse by the info pass and the writer
+OPEN_FILE_CACHE_SIZE = 32
+
 
 class MetadataParser(MetadataExtractorInterface):
     """Extract metadata from audio files using Mutagen."""
@@ -41,6 +44,9 @@ class MetadataParser(MetadataExtractorInterface):
                 'track_number': 'TRACKNUMBER',
                 'album_artist': 'ALBUMARTIST',
                 'composer': 'COMPOSER',
+                'musicbrainz_recording_id': 'MUSICBRAINZ_TRACKID',
+                'musicbrainz_release_id': 'MUSICBRAINZ_ALBUMID',
+                'musicbrainz_artist_id': 'MUSICBRAINZ_ARTISTID',
             },
             'mp3': {
                 'title': 'TIT2',
@@ -51,6 +57,11 @@ class MetadataParser(MetadataExtractorInterface):
                 'track_number': 'TRCK',
                 'album_artist': 'TPE2',
                 'composer': 'TCOM',
+                # Picard's layout: the recording ID is the UFID frame, not
+                # the "MusicBrainz Release Track Id" TXXX
+                'musicbrainz_recording_id': 'UFID:http://musicbrainz.org',
+                'musicbrainz_release_id': 'TXXX:MusicBrainz Album Id',
+                'musicbrainz_artist_id': 'TXXX:MusicBrainz Artist Id',
             },
             'mp4': {
                 'title': '\xa9nam',
@@ -61,13 +72,30 @@ class MetadataParser(MetadataExtractorInterface):
                 'track_number': 'trkn',
                 'album_artist': 'aART',
                 'composer': '\xa9wrt',
+                'musicbrainz_recording_id': '----:com.apple.iTunes:MusicBrainz Track Id',
+                'musicbrainz_release_id': '----:com.apple.iTunes:MusicBrainz Album Id',
+                'musicbrainz_artist_id': '----:com.apple.iTunes:MusicBrainz Artist Id',
             },
         }
+        # Flattened (standard_key, format_key) pairs so extraction is a plain loop
+        self._field_lists: Dict[str, List[tuple]] = {
+            file_format: list(mapping.items())
+            for file_format, mapping in self.format_mappings.items()
+        }
         self.supported_formats = {'flac', 'mp3', 'mp4', 'ogg', 'wav'}
 
+        # (path, mtime_ns) -> parsed mutagen file, so one read pass parses
+        # the tag block once and a following write can reuse the object
+        self._opened: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._opened_lock = threading.Lock()
+
     def extract_metadata(self, file_path: Path) -> AudioMetadata:
         file_path = Path(file_path)
-        if not file_path.exists():
+        # One stat per file serves the existence check, the parse cache key
+        # and the reported size; each is a round trip on a network share
+        try:
+            stat_result = file_path.stat()
+        except OSError:
             raise FileProcessingError(
                 f"File not found: {file_path}",
                 str(file_path),
@@ -75,13 +103,13 @@ class MetadataParser(MetadataExtractorInterface):
             )
 
         try:
-            audio_file = mutagen.File(str(file_path))
+            audio_file = self._open(file_path, stat_result)
             if audio_file is None:
                 return AudioMetadata(source="embedded")
 
             file_format = self._detect_format(audio_file)
             metadata = self._extract_by_format(audio_file, file_format)
-            metadata.file_info = self.extract_file_info(file_path)
+            metadata.file_info = self._build_file_info(file_path, audio_file, stat_result)
             metadata.source = "embedded"
             return metadata
         except Exception as e:
@@ -95,26 +123,9 @@ class MetadataParser(MetadataExtractorInterface):
     def extract_file_info(self, file_path: Path) -> AudioFileInfo:
         file_path = Path(file_path)
         try:
-            audio_file = mutagen.File(str(file_path))
-            file_format = self._detect_format(audio_file) if audio_file else 'unknown'
-            file_info = AudioFileInfo(
-                file_path=file_path,
-                file_format=file_format,
-                file_size=file_path.stat().st_size,
-                duration=0.0,
-                bitrate=0,
-                sample_rate=0,
-                channels=0,
-                bits_per_sample=0,
-            )
-            if audio_file and hasattr(audio_file, 'info'):
-                info = audio_file.info
-                file_info.duration = getattr(info, 'length', 0.0)
-                file_info.bitrate = getattr(info, 'bitrate', 0)
-                file_info.sample_rate = getattr(info, 'sample_rate', 0)
-                file_info.channels = getattr(info, 'channels', 0)
-                file_info.bits_per_sample = getattr(info, 'bits_per_sample', 0)
-            return file_info
+            stat_result = file_path.stat()
+            audio_file = self._open(file_path, stat_result)
+            return self._build_file_info(file_path, audio_file, stat_result)
         except Exception as e:
             logger.error(f"Error extracting file info from {file_path}: {e}")
             raise FileProcessingError(
@@ -123,9 +134,66 @@ class MetadataParser(MetadataExtractorInterface):
                 "extract_info",
             )
 
+    def _build_file_info(self, file_path: Path, audio_file, stat_result: os.stat_result) -> AudioFileInfo:
+        file_format = self._detect_format(audio_file) if audio_file else 'unknown'
+        file_info = AudioFileInfo(
+            file_path=file_path,
+            file_format=file_format,
+            file_size=stat_result.st_size,
+            duration=0.0,
+            bitrate=0,
+            sample_rate=0,
+            channels=0,
+            bits_per_sample=0,
+        )
+        if audio_file and hasattr(audio_file, 'info'):
+            info = audio_file.info
+            file_info.duration = getattr(info, 'length', 0.0)
+            file_info.bitrate = getattr(info, 'bitrate', 0)
+            file_info.sample_rate = getattr(info, 'sample_rate', 0)
+            file_info.channels = getattr(info, 'channels', 0)
+            file_info.bits_per_sample = getattr(info, 'bits_per_sample', 0)
+        return file_info
+
     def supports_format(self, file_format: str) -> bool:
         return file_format.lower() in self.supported_formats
 
+    def take_opened(self, file_path: Path):
+        """
+        Hand over the parsed mutagen file for file_path, if still current.
+
+        The entry is removed, since writing it changes the file on disk.
+        Returns None when the file was not parsed recently or has changed.
+        """
+        try:
+            key = self._open_key(Path(file_path))
+        except OSError:
+            return None
+        with self._opened_lock:
+            return self._opened.pop(key, None)
+
+    def _open_key(self, file_path: Path, stat_result: Optional[os.stat_result] = None) -> tuple:
+        if stat_result is None:
+            stat_result = file_path.stat()
+        return (str(file_path), stat_result.st_mtime_ns)
+
+    def _open(self, file_path: Path, stat_result: Optional[os.stat_result] = None):
+        """Parse file_path with mutagen, reusing a recent parse of the same file."""
+        key = self._open_key(file_path, stat_result)
+        with self._opened_lock:
+            audio_file = self._opened.get(key)
+            if audio_file is not None:
+                self._opened.move_to_end(key)
+                return audio_file
+
+        audio_file = mutagen.File(str(file_path))
+        if audio_file is not None:
+            with self._opened_lock:
+                self._opened[key] = audio_file
+                while len(self._opened) > OPEN_FILE_CACHE_SIZE:
+                    self._opened.popitem(last=False)
+        return audio_file
+
     def _detect_format(self, audio_file) -> str:
         if audio_file is None:
             return 'unknown'
@@ -139,11 +207,19 @@ class MetadataParser(MetadataExtractorInterface):
         return mapping.get(type(audio_file).__name__, 'unknown')
 
     def _extract_by_format(self, audio_file, file_format: str) -> AudioMetadata:
-        metadata = AudioMetadata()
-        if file_format not in self.format_mappings:
+        field_list = self._field_lists.get(file_format)
+        if field_list is None:
             return self._extract_generic(audio_file)
-        for standard_key, format_key in self.format_mappings[file_format].items():
-            value = self._get_tag_value(audio_file, format_key)
+        metadata = AudioMetadata()
+        # Lookup inlined (this runs for every tag); values go through the
+        # same _tag_text conversion as _get_tag_value
+        for standard_key, format_key in field_list:
+            try:
+                if format_key not in audio_file:
+                    continue
+                value = _tag_text(audio_file[format_key])
+            except (KeyError, AttributeError):
+                continue
             if value:
                 setattr(metadata, standard_key, value)
         return metadata
@@ -169,15 +245,33 @@ class MetadataParser(MetadataExtractorInterface):
     def _get_tag_value(self, audio_file, key: str) -> Optional[str]:
         try:
             if key in audio_file:
-                value = audio_file[key]
-                if isinstance(value, list) and len(value) > 0:
-                    return str(value[0])
-                elif isinstance(value, (str, int, float)):
-                    return str(value)
+                return _tag_text(audio_file[key])
         except (KeyError, AttributeError):
             pass
         return None
 
 
+def _tag_text(value) -> Optional[str]:
+    """Text of a mutagen tag value: a list's first item, an ID3 frame, or a scalar."""
+    if isinstance(value, list):
+        if not value:
+            return None
+        value = value[0]
+    elif hasattr(value, 'text'):
+        # ID3 text frames (TIT2, TXXX, ...) hold a list of strings
+        if not value.text:
+            return None
+        value = value.text[0]
+    elif hasattr(value, 'data'):
+        # UFID frame
+        value = value.data
+    elif not isinstance(value, (str, int, float)):
+        return None
+    # UFID data and MP4 freeform atoms are bytes
+    if isinstance(value, bytes):
+        value = value.decode('utf-8', 'replace')
+    return str(value)
+
+
 # --- ALIAS FOR COMPATIBILITY ---
 MetadataExtractor = MetadataParser
@@ -3,8 +3,10 @@ File service for handling audio file operations.
 """
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from ..core.interfaces import (
     MetadataExtractorInterface,
@@ -16,6 +18,79 @@ from ..core.exceptions import FileProcessingError, MetadataParsingError
 
 logger = logging.getLogger(__name__)
 
+# Built once; these are consulted for every file found during a scan
+DEFAULT_AUDIO_EXTENSIONS = frozenset({'.flac', '.mp3', '.m4a', '.ogg', '.wav'})
+SUFFIX_FORMATS = {
+    '.flac': 'flac',
+    '.mp3': 'mp3',
+    '.m4a': 'mp4',
+    '.mp4': 'mp4',
+    '.ogg': 'ogg',
+    '.wav': 'wav',
+}
+
+# Per-process extractor and writer for batch workers, created on first use
+_worker_extractor = None
+_worker_writer = None
+
+
+def _init_worker() -> None:
+    """Pool initializer: import mutagen and build the extractor and writer once."""
+    global _worker_extractor, _worker_writer
+    from ..parsers.metadata_parser import MetadataExtractor
+    from ..writers.mutagen_writer import MutagenWriter
+
+    _worker_extractor = MetadataExtractor()
+    _worker_writer = MutagenWriter()
+
+
+def iter_audio_files(root: str, extensions: frozenset, recursive: bool = True):
+    """
+    Yield paths of files under root whose lowercased suffix is in extensions.
+
+    Walks with os.scandir so rejected entries never become Path objects and
+    file/dir checks use the cached directory entry type.
+    """
+    try:
+        entries = os.scandir(root)
+    except OSError as e:
+        logger.warning(f"Cannot list {root}: {e}")
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    yield from iter_audio_files(entry.path, extensions, recursive)
+            elif '.' + entry.name.rpartition('.')[2].lower() in extensions and entry.is_file():
+                yield entry.path
+
+
+def _extract_in_worker(file_path: Path) -> Optional[AudioMetadata]:
+    """Extract metadata inside a pool worker, returning None on failure."""
+    if _worker_extractor is None:
+        _init_worker()
+    try:
+        return _worker_extractor.extract_metadata(file_path)
+    except Exception as e:
+        # Exceptions with custom __init__ signatures do not survive pickling
+        logger.error(f"Failed to extract metadata from {file_path}: {e}")
+        return None
+
+
+def _write_in_worker(item: Tuple[Path, AudioMetadata, bool]) -> ProcessingResult:
+    """Write metadata inside a pool worker, reporting failures in the result."""
+    if _worker_writer is None:
+        _init_worker()
+    file_path, metadata, create_backup = item
+    try:
+        return _worker_writer.write_metadata(file_path, metadata, create_backup)
+    except Exception as e:
+        logger.error(f"Failed to write metadata to {file_path}: {e}")
+        return ProcessingResult(
+            success=False,
+            error=f"Write operation failed: {e}",
+        )
+
 
 class FileService:
     """
@@ -30,6 +105,7 @@ class FileService:
         extractor: MetadataExtractorInterface = None,
         writer: MetadataWriterInterface = None,
         filename_parser: MetadataParserInterface = None,
+        defer_saves: bool = False,
     ):
         """
         Initialize file service with pluggable components.
@@ -38,7 +114,14 @@ class FileService:
             extractor: Metadata extractor implementation
             writer: Metadata writer implementation
             filename_parser: Filename parser implementation
+            defer_saves: Let the default writer save files in the background;
+                see flush()
         """
+        # Batch extraction can only rebuild the default extractor in workers
+        self._default_extractor = extractor is None
+        # The default writer can save the extractor's already-parsed file
+        self._default_writer = writer is None
+
         # Import here to avoid circular dependencies
         if extractor is None:
             from ..parsers.metadata_parser import MetadataExtractor
@@ -48,7 +131,7 @@ class FileService:
         if writer is None:
             from ..writers.mutagen_writer import MutagenWriter
 
-            writer = MutagenWriter()
+            writer = MutagenWriter(defer_saves=defer_saves)
 
         if filename_parser is None:
             from ..parsers.filename_parser import FilenameParser
@@ -74,6 +157,34 @@ class FileService:
                 "extract",
             )
 
+    def extract_metadata_batch(
+        self,
+        file_paths: List[Path],
+        max_workers: int = None,
+        chunksize: int = 64,
+    ) -> List[Optional[AudioMetadata]]:
+        """
+        Extract metadata from many audio files using a process pool.
+
+        Tag parsing is CPU-bound, so workers scale with cores where threads
+        would not. Results keep the input order; files that fail to parse
+        yield None instead of aborting the batch. A custom extractor cannot
+        be rebuilt in the workers, so it is run serially instead.
+        """
+        file_paths = [Path(p) for p in file_paths]
+
+        if not self._default_extractor or max_workers == 1 or len(file_paths) <= 1:
+            results: List[Optional[AudioMetadata]] = []
+            for file_path in file_paths:
+                try:
+                    results.append(self.extract_metadata(file_path))
+                except FileProcessingError:
+                    results.append(None)
+            return results
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            return list(pool.map(_extract_in_worker, file_paths, chunksize=chunksize))
+
     def extract_file_info(self, file_path: Path) -> Optional[AudioFileInfo]:
         """
         Extract technical file information.
@@ -117,6 +228,13 @@ class FileService:
         """
         file_path = Path(file_path)
         try:
+            audio_file = None
+            if self._default_writer and hasattr(self.extractor, 'take_opened'):
+                audio_file = self.extractor.take_opened(file_path)
+            if audio_file is not None:
+                return self.writer.write_metadata(
+                    file_path, metadata, create_backup, audio_file=audio_file,
+                )
             return self.writer.write_metadata(file_path, metadata, create_backup)
         except Exception as e:
             logger.error(f"Failed to write metadata to {file_path}: {e}")
@@ -125,6 +243,41 @@ class FileService:
                 error=f"Write operation failed: {e}",
             )
 
+    def write_metadata_batch(
+        self,
+        items: List[Tuple[Path, AudioMetadata]],
+        create_backup: bool = True,
+        max_workers: int = None,
+        chunksize: int = 16,
+    ) -> List[ProcessingResult]:
+        """
+        Write metadata to many audio files using a process pool.
+
+        Results keep the input order. As with extract_metadata_batch, a
+        custom writer cannot be rebuilt in the workers and runs serially.
+        """
+        items = [(Path(file_path), metadata) for file_path, metadata in items]
+
+        if not self._default_writer or max_workers == 1 or len(items) <= 1:
+            return [
+                self.write_metadata(file_path, metadata, create_backup)
+                for file_path, metadata in items
+            ]
+
+        work = [(file_path, metadata, create_backup) for file_path, metadata in items]
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            return list(pool.map(_write_in_worker, work, chunksize=chunksize))
+
+    def flush(self) -> Dict[str, str]:
+        """
+        Wait for background saves, if the writer queues them.
+
+        Returns:
+            Dictionary mapping paths whose save failed to the error message
+        """
+        flush = getattr(self.writer, 'flush', None)
+        return flush() if flush else {}
+
     def validate_file(self, file_path: Path) -> bool:
         """
         Validate that file exists and is a supported audio format.
@@ -153,30 +306,19 @@ class FileService:
         directory = Path(directory)
 
         if extensions is None:
-            extensions = ['.flac', '.mp3', '.m4a', '.ogg', '.wav']
-
-        extensions = [ext.lower() for ext in extensions]
+            extensions = DEFAULT_AUDIO_EXTENSIONS
+        else:
+            extensions = frozenset(ext.lower() for ext in extensions)
         audio_files: List[Path] = []
 
-        pattern = "**/*" if recursive else "*"
-
-        for file_path in directory.glob(pattern):
-            if file_path.is_file() and file_path.suffix.lower() in extensions:
-                if self.validate_file(file_path):
-                    audio_files.append(file_path)
+        for path in iter_audio_files(str(directory), extensions, recursive):
+            file_path = Path(path)
+            # Existence and file type are already known from the walk
+            if self.extractor.supports_format(self._detect_format(file_path)):
+                audio_files.append(file_path)
 
         return audio_files
 
     def _detect_format(self, file_path: Path) -> str:
         """Detect audio format from file extension."""
-        file_path = Path(file_path)
-        suffix = file_path.suffix.lower()
-        format_mapping = {
-            '.flac': 'flac',
-            '.mp3': 'mp3',
-            '.m4a': 'mp4',
-            '.mp4': 'mp4',
-            '.ogg': 'ogg',
-            '.wav': 'wav',
-        }
-        return format_mapping.get(suffix, 'unknown')
+        return SUFFIX_FORMATS.get(Path(file_path).suffix.lower(), 'unknown')
@@ -2,13 +2,14 @@
 Main metadata processing service orchestrating all operations.
 """
 
+import asyncio
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import time
 
 from ..core.interfaces import MetadataServiceInterface
-from ..core.models import AudioMetadata, ProcessingResult
+from ..core.models import AudioMetadata, MetadataSearchResult, ProcessingResult
 from ..core.exceptions import MetadataProcessingError, FileProcessingError
 
 from .file_service import FileService
@@ -61,54 +62,15 @@ class MetadataService(MetadataServiceInterface):
                     error=f"Could not extract metadata from: {file_path}"
                 )
             
-            logger.debug(f"Current metadata: {current_metadata.to_dict()}")
-            
-            # Step 2: Check if metadata is already complete
-            missing_fields = current_metadata.get_missing_fields()
-            if not missing_fields:
-                logger.info(f"Metadata already complete for: {file_path}")
-                result = ProcessingResult(success=True, metadata=current_metadata)
-                result.processing_time = time.time() - start_time
-                return result
-            
-            logger.info(f"Missing fields: {missing_fields}")
-            
-            # Step 3: Try filename parsing if no searchable metadata
-            if not self._has_searchable_metadata(current_metadata):
-                logger.info("No searchable metadata found, attempting filename parsing")
-                filename_metadata = self.file_service.parse_filename(file_path)
-                if filename_metadata:
-                    logger.info(f"Extracted from filename: {filename_metadata.to_dict()}")
-                    current_metadata = current_metadata.merge(filename_metadata, prefer_existing=True)
-            
-            # Step 4: Search for missing metadata using MusicBrainz
-            completed_metadata = self._complete_metadata_from_musicbrainz(current_metadata)
+            # Steps 2-4: Fill missing fields from filename and MusicBrainz
+            result, completed_metadata = self._search_phase(file_path, current_metadata)
             
             # Step 5: Write metadata back to file if requested
             if write_metadata and completed_metadata:
                 write_result = self.file_service.write_metadata(file_path, completed_metadata)
-                if not write_result.success:
-                    result = ProcessingResult(
-                        success=False,
-                        metadata=completed_metadata,
-                        error=f"Failed to write metadata: {write_result.error}"
-                    )
-                    result.processing_time = time.time() - start_time
-                    return result
-            
-            # Step 6: Return results
-            result = ProcessingResult(
-                success=True,
-                metadata=completed_metadata or current_metadata
-            )
-            result.processing_time = time.time() - start_time
-            
-            if completed_metadata:
-                logger.info(f"Metadata completed for: {file_path}")
-            else:
-                logger.warning(f"No suitable match found for: {file_path}")
-                result.add_warning("No suitable metadata match found")
+                result = self._apply_write_result(result, completed_metadata, write_result)
             
+            result.processing_time = time.time() - start_time
             return result
             
         except Exception as e:
@@ -121,26 +83,75 @@ class MetadataService(MetadataServiceInterface):
             return result
     
     def process_batch(self, file_paths: List[Path], 
-                     write_metadata: bool = False) -> Dict[str, ProcessingResult]:
+                     write_metadata: bool = False,
+                     max_workers: int = None) -> Dict[str, ProcessingResult]:
         """
         Process multiple audio files.
         
+        Tag reading and writing are CPU-bound mutagen work on independent
+        files, so they are fanned out over a process pool. MusicBrainz
+        lookups stay in this process, where the rate limiter, response cache
+        and in-flight coalescing are shared by every file.
+        
         Args:
             file_paths: List of file paths to process
             write_metadata: Whether to write metadata back to files
+            max_workers: Worker processes for tag I/O (default: CPU count)
             
         Returns:
             Dictionary mapping file paths to processing results
         """
-        results = {}
         total_files = len(file_paths)
         
         logger.info(f"Processing {total_files} files")
         
-        for i, file_path in enumerate(file_paths, 1):
+        # Phase 1: parallel tag extraction
+        extracted = self.file_service.extract_metadata_batch(file_paths, max_workers=max_workers)
+        
+        # Phase 2: metadata search, in this process. Files are grouped by
+        # directory so tracks of one album can share a single release lookup.
+        results: Dict[str, Optional[ProcessingResult]] = {str(file_path): None for file_path in file_paths}
+        groups: Dict[Path, List[Tuple[Path, AudioMetadata]]] = {}
+        for i, (file_path, current_metadata) in enumerate(zip(file_paths, extracted), 1):
             logger.info(f"Processing {i}/{total_files}: {file_path.name}")
-            result = self.process_file(file_path, write_metadata)
-            results[str(file_path)] = result
+            
+            if not current_metadata:
+                results[str(file_path)] = ProcessingResult(
+                    success=False,
+                    error=f"Could not extract metadata from: {file_path}"
+                )
+                continue
+            
+            try:
+                query_metadata = self._prepare_query(file_path, current_metadata)
+            except Exception as e:
+                logger.error(f"Error processing {file_path}: {e}")
+                results[str(file_path)] = ProcessingResult(success=False, error=str(e))
+                continue
+            
+            if query_metadata is None:
+                results[str(file_path)] = ProcessingResult(success=True, metadata=current_metadata)
+                continue
+            
+            groups.setdefault(file_path.parent, []).append((file_path, query_metadata))
+        
+        pending_writes: List[Tuple[Path, AudioMetadata]] = []
+        for group in groups.values():
+            for file_path, query_metadata, completed_metadata, elapsed in self._search_group(group):
+                result = self._search_result(file_path, query_metadata, completed_metadata)
+                result.processing_time = elapsed
+                results[str(file_path)] = result
+                if write_metadata and completed_metadata:
+                    pending_writes.append((file_path, completed_metadata))
+        
+        # Phase 3: parallel tag writing
+        if pending_writes:
+            write_results = self.file_service.write_metadata_batch(pending_writes, max_workers=max_workers)
+            for (file_path, completed_metadata), write_result in zip(pending_writes, write_results):
+                key = str(file_path)
+                results[key] = self._apply_write_result(results[key], completed_metadata, write_result)
+            
+        self._flush_writes(results)
             
         # Log summary
         successful = sum(1 for r in results.values() if r.success)
@@ -148,13 +159,184 @@ class MetadataService(MetadataServiceInterface):
         
         return results
     
+    async def aprocess_file(self, file_path: Path, write_metadata: bool = False) -> ProcessingResult:
+        """
+        Process a single audio file without blocking the event loop.
+        
+        Args:
+            file_path: Path to the audio file
+            write_metadata: Whether to write completed metadata back to file
+            
+        Returns:
+            ProcessingResult with success status and metadata
+        """
+        return await asyncio.to_thread(self.process_file, file_path, write_metadata)
+    
+    async def aprocess_batch(self, file_paths: List[Path], write_metadata: bool = False,
+                             max_concurrency: int = 8) -> Dict[str, ProcessingResult]:
+        """
+        Process multiple audio files concurrently.
+        
+        Tag reads, writes and cache hits for different files overlap, while
+        MusicBrainz network requests still go through the service's shared
+        rate limiter, so batch time approaches the larger of the two instead
+        of their sum.
+        
+        Args:
+            file_paths: List of file paths to process
+            write_metadata: Whether to write metadata back to files
+            max_concurrency: Maximum number of files in flight at once
+            
+        Returns:
+            Dictionary mapping file paths to processing results
+        """
+        total_files = len(file_paths)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        logger.info(f"Processing {total_files} files (concurrency {max_concurrency})")
+        
+        async def run(file_path: Path) -> ProcessingResult:
+            async with semaphore:
+                return await self.aprocess_file(file_path, write_metadata)
+        
+        processed = await asyncio.gather(*(run(file_path) for file_path in file_paths))
+        results = {str(file_path): result for file_path, result in zip(file_paths, processed)}
+        
+        await asyncio.to_thread(self._flush_writes, results)
+        
+        successful = sum(1 for r in results.values() if r.success)
+        logger.info(f"Batch processing complete: {successful}/{total_files} successful")
+        
+        return results
+    
+    def _search_phase(self, file_path: Path,
+                      current_metadata: AudioMetadata) -> Tuple[ProcessingResult, Optional[AudioMetadata]]:
+        """
+        Complete extracted metadata without touching the file's tags.
+        
+        Returns:
+            The processing result and the completed metadata to write, or
+            None when there is nothing to write
+        """
+        query_metadata = self._prepare_query(file_path, current_metadata)
+        if query_metadata is None:
+            return ProcessingResult(success=True, metadata=current_metadata), None
+        
+        # Step 4: Search for missing metadata using MusicBrainz
+        completed_metadata = self._complete_metadata_from_musicbrainz(query_metadata)
+        
+        return self._search_result(file_path, query_metadata, completed_metadata), completed_metadata
+    
+    def _prepare_query(self, file_path: Path, current_metadata: AudioMetadata) -> Optional[AudioMetadata]:
+        """
+        Build the metadata to search with, or None if nothing is missing.
+        """
+        logger.debug(f"Current metadata: {current_metadata.to_dict()}")
+        
+        # Step 2: Check if metadata is already complete
+        missing_fields = current_metadata.get_missing_fields()
+        if not missing_fields:
+            logger.info(f"Metadata already complete for: {file_path}")
+            return None
+        
+        logger.info(f"Missing fields: {missing_fields}")
+        
+        # Step 3: Try filename parsing if no searchable metadata
+        if not self._has_searchable_metadata(current_metadata):
+            logger.info("No searchable metadata found, attempting filename parsing")
+            filename_metadata = self.file_service.parse_filename(file_path)
+            if filename_metadata:
+                logger.info(f"Extracted from filename: {filename_metadata.to_dict()}")
+                current_metadata = current_metadata.merge(filename_metadata, prefer_existing=True)
+        
+        return current_metadata
+    
+    def _search_result(self, file_path: Path, query_metadata: AudioMetadata,
+                       completed_metadata: Optional[AudioMetadata]) -> ProcessingResult:
+        """Build the processing result for a finished search."""
+        result = ProcessingResult(
+            success=True,
+            metadata=completed_metadata or query_metadata
+        )
+        if completed_metadata:
+            logger.info(f"Metadata completed for: {file_path}")
+        else:
+            logger.warning(f"No suitable match found for: {file_path}")
+            result.add_warning("No suitable metadata match found")
+        return result
+    
+    def _search_group(self, group: List[Tuple[Path, AudioMetadata]]):
+        """
+        Complete metadata for files from one directory.
+        
+        The first file is searched normally; its release is then fetched
+        once and the other files are matched against that release's tracks
+        locally, falling back to their own search when no track matches.
+        
+        Yields:
+            (file_path, query_metadata, completed_metadata, elapsed seconds)
+        """
+        get_release_tracks = getattr(self.musicbrainz_service, 'get_release_tracks', None)
+        tracks = None
+        
+        for file_path, query_metadata in group:
+            start_time = time.time()
+            completed_metadata = None
+            
+            if tracks:
+                match = self.musicbrainz_service.match_release_track(query_metadata, tracks)
+                if match:
+                    logger.info(f"Matched '{match.metadata.title}' from release (score: {match.confidence_score})")
+                    completed_metadata = self._merge_match(query_metadata, match)
+            
+            if completed_metadata is None:
+                completed_metadata = self._complete_metadata_from_musicbrainz(query_metadata)
+                if (tracks is None and len(group) > 1 and get_release_tracks
+                        and completed_metadata and completed_metadata.musicbrainz_release_id):
+                    tracks = get_release_tracks(completed_metadata.musicbrainz_release_id)
+            
+            yield file_path, query_metadata, completed_metadata, time.time() - start_time
+    
+    def _apply_write_result(self, result: ProcessingResult, completed_metadata: AudioMetadata,
+                            write_result: ProcessingResult) -> ProcessingResult:
+        """Turn a failed write into a failed processing result."""
+        if write_result.success:
+            return result
+        failed = ProcessingResult(
+            success=False,
+            metadata=completed_metadata,
+            error=f"Failed to write metadata: {write_result.error}"
+        )
+        failed.processing_time = result.processing_time
+        return failed
+    
+    def _flush_writes(self, results: Dict[str, ProcessingResult]) -> None:
+        """Wait for background saves and mark files whose save failed."""
+        flush = getattr(self.file_service, 'flush', None)
+        if flush is None:
+            return
+        for file_path, error in flush().items():
+            if file_path in results:
+                results[file_path] = self._apply_write_result(
+                    results[file_path],
+                    results[file_path].metadata,
+                    ProcessingResult(success=False, error=error),
+                )
+    
     def _has_searchable_metadata(self, metadata: AudioMetadata) -> bool:
-        """Check if metadata has enough information for searching."""
-        return any(getattr(metadata, field) for field in ['title', 'artist', 'album'])
+        """Check if metadata has enough information for searching or a direct lookup."""
+        return bool(metadata.musicbrainz_recording_id) or any(
+            getattr(metadata, field) for field in ['title', 'artist', 'album']
+        )
     
     def _complete_metadata_from_musicbrainz(self, metadata: AudioMetadata) -> Optional[AudioMetadata]:
         """Complete metadata using MusicBrainz search."""
         try:
+            # Tagged files: look the IDs up directly instead of searching
+            fast_match = self._lookup_by_musicbrainz_ids(metadata)
+            if fast_match:
+                return fast_match
+            
             search_results = self.musicbrainz_service.search_metadata(metadata)
             
             if not search_results:
@@ -164,13 +346,35 @@ class MetadataService(MetadataServiceInterface):
             best_match = search_results[0]
             logger.info(f"Best match: '{best_match.metadata.title}' (score: {best_match.confidence_score})")
             
-            # Merge with current metadata
-            completed_metadata = metadata.merge(best_match.metadata, prefer_existing=True)
-            completed_metadata.confidence = best_match.confidence_score
-            completed_metadata.source = f"{metadata.source}+musicbrainz"
-            
-            return completed_metadata
+            return self._merge_match(metadata, best_match)
             
         except Exception as e:
             logger.error(f"Error searching MusicBrainz: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    def _lookup_by_musicbrainz_ids(self, metadata: AudioMetadata) -> Optional[AudioMetadata]:
+        """Complete metadata from embedded MusicBrainz IDs, without a search."""
+        if metadata.musicbrainz_recording_id:
+            detailed = self.musicbrainz_service.get_detailed_metadata(metadata.musicbrainz_recording_id)
+            if detailed:
+                logger.info(f"Looked up recording {metadata.musicbrainz_recording_id} directly")
+                return self._merge_match(
+                    metadata,
+                    MetadataSearchResult(metadata=detailed, confidence_score=1.0, source="musicbrainz"),
+                )
+        
+        if metadata.musicbrainz_release_id:
+            tracks = self.musicbrainz_service.get_release_tracks(metadata.musicbrainz_release_id)
+            match = self.musicbrainz_service.match_release_track(metadata, tracks) if tracks else None
+            if match:
+                logger.info(f"Matched '{match.metadata.title}' from tagged release (score: {match.confidence_score})")
+                return self._merge_match(metadata, match)
+        
+        return None
+    
+    def _merge_match(self, metadata: AudioMetadata, match: MetadataSearchResult) -> AudioMetadata:
+        """Merge a MusicBrainz match into the current metadata."""
+        completed_metadata = metadata.merge(match.metadata, prefer_existing=True)
+        completed_metadata.confidence = match.confidence_score
+        completed_metadata.source = f"{metadata.source}+musicbrainz"
+        return completed_metadata
@@ -2,19 +2,108 @@
 MusicBrainz service for metadata search and retrieval.
 """
 
+import functools
+import json
 import logging
+import sqlite3
+import threading
 import requests
 import time
-from typing import List, Optional, Dict, Any
+from concurrent.futures import Future
+from typing import Iterator, List, Optional, Dict, Any
 from urllib.parse import urlencode
 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from rapidfuzz import fuzz
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
 from ..core.interfaces import MetadataSearchInterface
 from ..core.models import AudioMetadata, MetadataSearchResult
 from ..core.exceptions import MusicBrainzError
+from ..config.settings import MUSICBRAINZ_CONFIG
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
 
+# Fields compared when scoring a candidate, in AudioMetadata.scoring_fields()
+# order, with their weight in the confidence score
+SCORING_WEIGHTS = (
+    ('title', 2.0),
+    ('artist', 1.5),
+    ('album', 1.0),
+)
+
+
+def _query_phrase(value: Optional[str]) -> str:
+    """Normalize a field for use inside a quoted Lucene phrase."""
+    if not value:
+        return ""
+    return value.strip().replace('\\', '\\\\').replace('"', '\\"')
+
+
+@functools.lru_cache(maxsize=4096)
+def _build_query(title: str, artist: str, album: str) -> str:
+    """Build the Lucene recording query; memoized since album tracks repeat fields."""
+    query_parts = []
+    
+    if title:
+        query_parts.append(f'recording:"{title}"')
+        
+    if artist:
+        query_parts.append(f'artist:"{artist}"')
+        
+    if album:
+        query_parts.append(f'release:"{album}"')
+    
+    if not query_parts:
+        return ""
+    
+    query = ' AND '.join(query_parts)
+    if title and len(query_parts) > 1:
+        # Title-only alternative in the same request instead of a
+        # second fallback search; full matches still rank first
+        query = f'({query}) OR recording:"{title}"'
+    return query
+
+
+def _indel_ratio(a: str, b: str) -> float:
+    """
+    Normalized Indel similarity, 2 * LCS / (len(a) + len(b)).
+    
+    The same metric as rapidfuzz's fuzz.ratio, so confidence scores (and
+    so the search threshold) don't depend on whether rapidfuzz is
+    installed. difflib's SequenceMatcher is a heuristic and differs.
+    """
+    if not a and not b:
+        return 1.0
+    previous = [0] * (len(b) + 1)
+    for char_a in a:
+        current = [0]
+        for j, char_b in enumerate(b):
+            current.append(previous[j] + 1 if char_a == char_b else max(previous[j + 1], current[j]))
+        previous = current
+    return 2 * previous[-1] / (len(a) + len(b))
+
+
+def _text_similarity(a: str, b: str) -> float:
+    """Similarity ratio in [0, 1] of two already-lowercased strings."""
+    if RAPIDFUZZ_AVAILABLE:
+        return fuzz.ratio(a, b) / 100.0
+    return _indel_ratio(a, b)
+
+
 class MusicBrainzService(MetadataSearchInterface):
     """
     Service for interacting with MusicBrainz API.
@@ -36,14 +125,45 @@ class MusicBrainzService(MetadataSearchInterface):
         self.base_url = config['base_url']
         self.user_agent = config['user_agent']
         self.rate_limit = config['rate_limit']
+        self.rate_limit_burst = config.get('rate_limit_burst', MUSICBRAINZ_CONFIG['rate_limit_burst'])
         self.timeout = config['timeout']
         self.search_threshold = config.get('search_threshold', 0.8)
         self.max_search_results = config.get('max_search_results', 10)
+        self.early_exit_confidence = config.get('early_exit_confidence', 0.95)
         
-        self.last_request_time = 0
+        # Token bucket: bursts of up to rate_limit_burst requests, refilled
+        # at rate_limit tokens per second. Shared by concurrent callers.
+        self._tokens = float(self.rate_limit_burst)
+        self._last_refill = time.monotonic()
+        self._rate_limit_lock = threading.Lock()
         
-        # Setup session
+        # Persistent response cache, also holding validators for revalidation
+        self.cache_ttl = config.get('cache_ttl', MUSICBRAINZ_CONFIG['cache_ttl'])
+        self.lookup_cache_ttl = config.get('lookup_cache_ttl', MUSICBRAINZ_CONFIG['lookup_cache_ttl'])
+        self.negative_cache_ttl = config.get('negative_cache_ttl', MUSICBRAINZ_CONFIG['negative_cache_ttl'])
+        self.refresh_negatives = config.get('refresh_negatives', MUSICBRAINZ_CONFIG['refresh_negatives'])
+        self.cache = self._open_cache(config.get('cache_path'))
+        
+        # Requests currently on the wire, keyed by cache key, so concurrent
+        # identical queries (e.g. tracks of one album) share a single call
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Setup session; the pooled adapter keeps TLS connections alive across
+        # concurrent callers and retries MusicBrainz's 503 throttling replies
         self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[503, 504],
+                respect_retry_after_header=True,
+            ),
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': self.user_agent,
             'Accept': 'application/json'
@@ -78,21 +198,8 @@ class MusicBrainzService(MetadataSearchInterface):
             recordings = response.get('recordings', [])
             logger.info(f"Found {len(recordings)} potential matches")
             
-            if not recordings:
-                # Fallback: search with just title
-                if query_metadata.title:
-                    logger.info("Searching with title only")
-                    fallback_params = {'query': f'recording:"{query_metadata.title}"'}
-                    response = self._make_request("recording", fallback_params)
-                    if response:
-                        recordings = response.get('recordings', [])
-            
-            # Convert to search results
-            results = []
-            for recording in recordings[:max_results]:
-                search_result = self._recording_to_search_result(recording, query_metadata)
-                if search_result and search_result.confidence_score >= self.search_threshold:
-                    results.append(search_result)
+            # Convert to search results, stopping at a near-certain match
+            results = list(self._score_candidates(recordings[:max_results], query_metadata))
             
             # Sort by confidence score
             results.sort(key=lambda x: x.confidence_score, reverse=True)
@@ -103,6 +210,23 @@ class MusicBrainzService(MetadataSearchInterface):
             logger.error(f"Error searching MusicBrainz: {e}")
             raise MusicBrainzError(f"Search failed: {e}")
     
+    def _score_candidates(self, recordings: List[Dict[str, Any]],
+                          query_metadata: AudioMetadata) -> Iterator[MetadataSearchResult]:
+        """
+        Yield candidates above the search threshold, best MusicBrainz score first.
+        
+        MusicBrainz's own relevance score is used as a prior, so a candidate
+        at or above early_exit_confidence ends the scoring of the rest.
+        """
+        ranked = sorted(recordings, key=lambda r: r.get('score') or 0, reverse=True)
+        query_fields = query_metadata.scoring_fields()
+        for recording in ranked:
+            search_result = self._recording_to_search_result(recording, query_metadata, query_fields)
+            if search_result and search_result.confidence_score >= self.search_threshold:
+                yield search_result
+                if search_result.confidence_score >= self.early_exit_confidence:
+                    return
+    
     def get_detailed_metadata(self, recording_id: str) -> Optional[AudioMetadata]:
         """
         Get detailed metadata for a specific recording.
@@ -127,38 +251,112 @@ class MusicBrainzService(MetadataSearchInterface):
             logger.error(f"Error getting detailed metadata for {recording_id}: {e}")
             return None
     
-    def _build_search_params(self, metadata: AudioMetadata) -> Dict[str, str]:
-        """Build search parameters from metadata."""
-        params = {}
-        
-        # Build query components
-        query_parts = []
+    def get_release_tracks(self, release_id: str) -> List[AudioMetadata]:
+        """
+        Get metadata for every track on a release with a single lookup.
         
-        if metadata.title:
-            query_parts.append(f'recording:"{metadata.title}"')
+        Args:
+            release_id: MusicBrainz release ID
+            
+        Returns:
+            AudioMetadata per track in release order, empty if not found
+        """
+        try:
+            params = {'inc': 'recordings+artist-credits+release-groups+genres'}
+            response = self._make_request(f"release/{release_id}", params)
+            
+            if not response:
+                return []
+            
+            release = {
+                'id': response.get('id'),
+                'title': response.get('title'),
+                'date': response.get('date'),
+                'release-group': response.get('release-group', {}),
+            }
             
-        if metadata.artist:
-            query_parts.append(f'artist:"{metadata.artist}"')
+            tracks = []
+            for medium in response.get('media', []):
+                for track in medium.get('tracks', []):
+                    recording = dict(track.get('recording') or {})
+                    recording.setdefault('title', track.get('title'))
+                    if not recording.get('artist-credit'):
+                        recording['artist-credit'] = track.get('artist-credit') or response.get('artist-credit', [])
+                    recording['releases'] = [release]
+                    
+                    metadata = self._recording_to_metadata(recording)
+                    if metadata:
+                        if track.get('position'):
+                            metadata.track_number = str(track['position']).zfill(2)
+                        tracks.append(metadata)
             
-        if metadata.album:
-            query_parts.append(f'release:"{metadata.album}"')
+            return tracks
+            
+        except Exception as e:
+            logger.error(f"Error getting tracks for release {release_id}: {e}")
+            return []
+    
+    def match_release_track(self, query_metadata: AudioMetadata,
+                            tracks: List[AudioMetadata]) -> Optional[MetadataSearchResult]:
+        """
+        Pick the release track best matching query_metadata, without a search.
         
-        if query_parts:
-            params['query'] = ' AND '.join(query_parts)
+        Args:
+            query_metadata: Metadata of the file to match
+            tracks: Tracks from get_release_tracks
+            
+        Returns:
+            The best match above the search threshold, or None
+        """
+        query_fields = query_metadata.scoring_fields()
+        best = None
+        for track in tracks:
+            confidence, score_details = self._score_fields(query_fields, track.scoring_fields())
+            if best is None or confidence > best[0]:
+                best = (confidence, score_details, track)
+        
+        if best is None or best[0] < self.search_threshold:
+            return None
+        
+        confidence, score_details, track = best
+        return MetadataSearchResult(
+            metadata=track,
+            confidence_score=confidence,
+            source="musicbrainz",
+            match_details={
+                'recording_id': track.musicbrainz_recording_id,
+                'score_details': score_details
+            }
+        )
+    
+    def _build_search_params(self, metadata: AudioMetadata) -> Dict[str, str]:
+        """Build search parameters from metadata."""
+        params = {}
+        
+        query = _build_query(
+            _query_phrase(metadata.title),
+            _query_phrase(metadata.artist),
+            _query_phrase(metadata.album),
+        )
+        if query:
+            params['query'] = query
             params['limit'] = str(self.max_search_results)
             
         return params
     
     def _recording_to_search_result(self, recording: Dict[str, Any], 
-                                  query_metadata: AudioMetadata) -> Optional[MetadataSearchResult]:
+                                  query_metadata: AudioMetadata,
+                                  query_fields: Optional[tuple] = None) -> Optional[MetadataSearchResult]:
         """Convert MusicBrainz recording to search result."""
         try:
             metadata = self._recording_to_metadata(recording)
             if not metadata:
                 return None
                 
-            # Calculate confidence score
-            confidence = self._calculate_similarity(query_metadata, metadata)
+            # Calculate confidence score from per-field similarities computed once
+            if query_fields is None:
+                query_fields = query_metadata.scoring_fields()
+            confidence, score_details = self._score_fields(query_fields, metadata.scoring_fields())
             
             return MetadataSearchResult(
                 metadata=metadata,
@@ -166,7 +364,7 @@ class MusicBrainzService(MetadataSearchInterface):
                 source="musicbrainz",
                 match_details={
                     'recording_id': recording.get('id'),
-                    'score_details': self._get_score_details(query_metadata, metadata)
+                    'score_details': score_details
                 }
             )
             
@@ -212,66 +410,104 @@ class MusicBrainzService(MetadataSearchInterface):
     
     def _calculate_similarity(self, query: AudioMetadata, candidate: AudioMetadata) -> float:
         """Calculate similarity score between two metadata objects."""
-        from difflib import SequenceMatcher
+        return self._score_fields(query.scoring_fields(), candidate.scoring_fields())[0]
+    
+    def _get_score_details(self, query: AudioMetadata, candidate: AudioMetadata) -> Dict[str, float]:
+        """Get detailed scoring breakdown."""
+        return self._score_fields(query.scoring_fields(), candidate.scoring_fields())[1]
+    
+    def _score_fields(self, query_fields: tuple, candidate_fields: tuple):
+        """
+        Score lowercased (title, artist, album) tuples against each other.
         
+        Returns:
+            Tuple of (confidence score, per-field similarity details)
+        """
         score = 0.0
         total_weight = 0.0
+        details = {}
         
-        # Define field weights
-        weights = {
-            'title': 2.0,
-            'artist': 1.5,
-            'album': 1.0
-        }
-        
-        for field, weight in weights.items():
-            query_value = getattr(query, field, None)
-            candidate_value = getattr(candidate, field, None)
-            
+        for (field, weight), query_value, candidate_value in zip(SCORING_WEIGHTS, query_fields, candidate_fields):
             if query_value and candidate_value:
-                similarity = SequenceMatcher(None, 
-                                           query_value.lower(),
-                                           candidate_value.lower()).ratio()
+                similarity = _text_similarity(query_value, candidate_value)
                 score += similarity * weight
                 total_weight += weight
-            elif query_value or candidate_value:
-                # Penalty for missing field
-                total_weight += weight * 0.5
+            else:
+                similarity = 0.0
+                if query_value or candidate_value:
+                    # Penalty for missing field
+                    total_weight += weight * 0.5
+            details[f"{field}_similarity"] = similarity
         
-        return score / total_weight if total_weight > 0 else 0.0
+        confidence = score / total_weight if total_weight > 0 else 0.0
+        return confidence, details
     
-    def _get_score_details(self, query: AudioMetadata, candidate: AudioMetadata) -> Dict[str, float]:
-        """Get detailed scoring breakdown."""
-        from difflib import SequenceMatcher
+    def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict]:
+        """Make rate-limited request to MusicBrainz API, served from cache when fresh."""
+        params['fmt'] = 'json'
+        cache_key = self.cache.make_key(endpoint, params)
         
-        details = {}
-        fields = ['title', 'artist', 'album']
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[cache_key] = future
         
-        for field in fields:
-            query_value = getattr(query, field, None)
-            candidate_value = getattr(candidate, field, None)
-            
-            if query_value and candidate_value:
-                similarity = SequenceMatcher(None,
-                                           query_value.lower(),
-                                           candidate_value.lower()).ratio()
-                details[f"{field}_similarity"] = similarity
-            else:
-                details[f"{field}_similarity"] = 0.0
-                
-        return details
+        if not owner:
+            logger.debug(f"Joining in-flight request for {endpoint}")
+            return future.result()
+        
+        try:
+            data = self._fetch(endpoint, params, cache_key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(data)
+            return data
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
     
-    def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict]:
-        """Make rate-limited request to MusicBrainz API."""
+    def _fetch(self, endpoint: str, params: Dict[str, Any], cache_key: str) -> Optional[Dict]:
+        """Fetch a response from the cache or the API."""
+        url = f"{self.base_url}{endpoint}"
+        cached = self.cache.get(cache_key)
+        if cached and cached.is_fresh():
+            data = self._decode_json(cached.body)
+            if not (self.refresh_negatives and self._is_negative(data)):
+                logger.debug(f"Cache hit for {endpoint}")
+                return data
+        
         self._rate_limit_wait()
         
-        url = f"{self.base_url}{endpoint}"
-        params['fmt'] = 'json'
+        headers = {}
+        if cached:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
         
         try:
-            response = self.session.get(url, params=params, timeout=self.timeout)
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and cached:
+                logger.debug(f"Not modified, reusing cached response for {endpoint}")
+                data = self._decode_json(cached.body)
+                self.cache.touch(cache_key, self._cache_ttl_for(endpoint, data))
+                return data
+            
             response.raise_for_status()
-            return response.json()
+            body = response.content
+            data = self._decode_json(body)
+            self.cache.set(
+                cache_key,
+                body,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                self._cache_ttl_for(endpoint, data),
+            )
+            return data
             
         except requests.exceptions.RequestException as e:
             logger.error(f"MusicBrainz API request failed: {e}")
@@ -283,16 +519,46 @@ class MusicBrainzService(MetadataSearchInterface):
             logger.error(f"Unexpected error in MusicBrainz request: {e}")
             raise MusicBrainzError(f"Unexpected error: {e}")
     
+    def _decode_json(self, body: bytes) -> Dict:
+        """Decode a UTF-8 JSON response body."""
+        return orjson.loads(body) if ORJSON_AVAILABLE else json.loads(body)
+    
+    def _cache_ttl_for(self, endpoint: str, data: Optional[Dict] = None) -> float:
+        """Lookups by MBID ('recording/<id>') change rarely; searches drift sooner."""
+        if '/' in endpoint:
+            return self.lookup_cache_ttl
+        if self._is_negative(data):
+            # Remember misses briefly so new MusicBrainz entries get picked up
+            return self.negative_cache_ttl
+        return self.cache_ttl
+    
+    def _is_negative(self, data: Optional[Dict]) -> bool:
+        """Check if a search response found no recordings."""
+        return isinstance(data, dict) and 'recordings' in data and not data['recordings']
+    
+    def _open_cache(self, cache_path: Optional[str]) -> ResponseCache:
+        """Open the response cache, falling back to memory if the file is unusable."""
+        try:
+            return ResponseCache(cache_path)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open MusicBrainz cache at {cache_path}: {e}")
+            return ResponseCache(None)
+    
     def _rate_limit_wait(self):
-        """Enforce rate limiting."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        min_interval = 1.0 / self.rate_limit
-        
-        if time_since_last < min_interval:
-            time.sleep(min_interval - time_since_last)
-            
-        self.last_request_time = time.time()
+        """Take one token from the rate-limit bucket, sleeping until one is available."""
+        with self._rate_limit_lock:
+            self._refill_tokens()
+            if self._tokens < 1:
+                time.sleep((1 - self._tokens) / self.rate_limit)
+                self._refill_tokens()
+            self._tokens -= 1
+    
+    def _refill_tokens(self):
+        """Add the tokens earned since the last refill, up to the burst size."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(float(self.rate_limit_burst), self._tokens + elapsed * self.rate_limit)
+        self._last_refill = now
     
     def _get_default_config(self) -> Dict[str, Any]:
         """Get default configuration."""
@@ -300,7 +566,14 @@ class MusicBrainzService(MetadataSearchInterface):
             'base_url': 'https://musicbrainz.org/ws/2/',
             'user_agent': 'AudiophileNAS/1.0 (https://github.com/danshani/AudiophileNAS)',
             'rate_limit': 1.0,
+            'rate_limit_burst': MUSICBRAINZ_CONFIG['rate_limit_burst'],
             'timeout': 10,
             'search_threshold': 0.8,
-            'max_search_results': 10
+            'max_search_results': 10,
+            'early_exit_confidence': 0.95,
+            'cache_path': MUSICBRAINZ_CONFIG['cache_path'],
+            'cache_ttl': MUSICBRAINZ_CONFIG['cache_ttl'],
+            'lookup_cache_ttl': MUSICBRAINZ_CONFIG['lookup_cache_ttl'],
+            'negative_cache_ttl': MUSICBRAINZ_CONFIG['negative_cache_ttl'],
+            'refresh_negatives': MUSICBRAINZ_CONFIG['refresh_negatives'],
         }
\ No newline at end of file
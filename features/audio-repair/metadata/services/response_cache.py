@@ -0,0 +1,118 @@
+"""
+Persistent cache for raw API responses.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body with its HTTP validators."""
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    def is_fresh(self) -> bool:
+        """Check if the entry can be served without revalidation."""
+        return time.time() < self.expires_at
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of response bodies keyed by request.
+
+    Expired entries are kept rather than evicted so that their ETag /
+    Last-Modified validators can still be used for a conditional request.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Database file path; None keeps the cache in memory
+        """
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path or ':memory:'
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            self.conn.commit()
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Build a stable SHA-256 key for an endpoint and its parameters."""
+        request = {'ep': endpoint, 'p': params}
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(request, option=orjson.OPT_SORT_KEYS)
+        else:
+            # Same bytes as orjson, so keys match whichever is installed
+            payload = json.dumps(
+                request, sort_keys=True, separators=(',', ':'), ensure_ascii=False,
+            ).encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached entry for key, fresh or not."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(*row)
+
+    def set(self, key: str, body: bytes, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, ttl: float = 0) -> None:
+        """Store a response body valid for ttl seconds."""
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, body, etag, last_modified, time.time() + ttl),
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write response cache entry: {e}")
+
+    def touch(self, key: str, ttl: float) -> None:
+        """Extend the lifetime of an entry after a successful revalidation."""
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "UPDATE responses SET expires_at = ? WHERE key = ?",
+                    (time.time() + ttl, key),
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not refresh response cache entry: {e}")
@@ -3,9 +3,14 @@ Mutagen-based metadata writer.
 """
 
 import logging
+import operator
+import os
 import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
 try:
     import mutagen
@@ -14,9 +19,23 @@ try:
     from mutagen.mp4 import MP4
     from mutagen.oggvorbis import OggVorbis
     MUTAGEN_AVAILABLE = True
+
+    # isinstance dispatch, so subclasses of the mutagen types still match
+    _FORMAT_DISPATCH = (
+        (FLAC, 'flac'),
+        (MP3, 'mp3'),
+        (MP4, 'mp4'),
+        (OggVorbis, 'ogg'),
+    )
 except ImportError:
     MUTAGEN_AVAILABLE = False
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
 from ..core.interfaces import MetadataWriterInterface
     # AudioMetadata, ProcessingResult hold logical metadata + result state
 from ..core.models import AudioMetadata, ProcessingResult
@@ -24,14 +43,66 @@ from ..core.exceptions import MetadataWriteError
 
 logger = logging.getLogger(__name__)
 
+# Linux ioctl that clones a file's extents (btrfs, XFS with reflink=1)
+FICLONE = 0x40049409
+
+# MusicBrainz IDs are written with the same keys regardless of format
+MUSICBRAINZ_MAPPINGS = {
+    'musicbrainz_recording_id': 'MUSICBRAINZ_TRACKID',
+    'musicbrainz_release_id': 'MUSICBRAINZ_ALBUMID',
+    'musicbrainz_artist_id': 'MUSICBRAINZ_ARTISTID',
+}
+
+
+def _utf8_too_long(value: str, limit: int) -> bool:
+    """Check if value exceeds limit bytes in UTF-8, encoding only when unclear."""
+    if len(value) > limit:
+        return True
+    if len(value) * 4 <= limit or value.isascii():
+        return False
+    return len(value.encode('utf-8')) > limit
+
+
+def _wrap_text(value):
+    """Wrap a value as a list of strings."""
+    if isinstance(value, list):
+        return value
+    return [str(value)]
+
+
+def _wrap_mp4_track(value):
+    """MP4 track numbers are stored as (track, total) tuples."""
+    try:
+        return [(int(value), 0)]
+    except ValueError:
+        logger.warning(f"Invalid track number for MP4: {value}")
+        return None
+
 
 class MutagenWriter(MetadataWriterInterface):
     """Metadata writer using Mutagen library."""
 
-    def __init__(self):
+    def __init__(self, defer_saves: bool = False):
+        """
+        Backups are made copy-on-write clones where the filesystem supports
+        it (btrfs, XFS), so they cost no extra I/O or space until the tags
+        are rewritten; elsewhere the file is copied. Hardlinks are not used:
+        mutagen saves in place, which would modify the backup as well.
+
+        Args:
+            defer_saves: Queue file saves on a background thread so the caller
+                can move on to the next file; call flush() to wait for them
+                and collect save errors
+        """
         if not MUTAGEN_AVAILABLE:
             raise ImportError("Mutagen library is required for metadata writing")
 
+        # A single save thread keeps writes sequential on spinning disks
+        self.defer_saves = defer_saves
+        self._save_pool = ThreadPoolExecutor(max_workers=1) if defer_saves else None
+        self._pending_saves: List[Tuple[Path, Future]] = []
+        self._pending_lock = threading.Lock()
+
         # Format mappings
         self.format_mappings = {
             'flac': {
@@ -68,13 +139,36 @@ class MutagenWriter(MetadataWriterInterface):
 
         self.supported_formats = {'flac', 'mp3', 'mp4', 'ogg'}
 
+        # Per-format write tables built once: an attrgetter pulling every
+        # field in one call, and (format_key, wrap) pairs in the same order
+        self._writers = {
+            file_format: self._build_writer(file_format, mapping)
+            for file_format, mapping in self.format_mappings.items()
+        }
+
+    @staticmethod
+    def _build_writer(file_format: str, mapping: dict):
+        """Build the (getter, [(format_key, wrap), ...]) table for a format."""
+        fields = {**mapping, **MUSICBRAINZ_MAPPINGS}
+        targets = [
+            (format_key, _wrap_mp4_track if file_format == 'mp4' and format_key == 'trkn' else _wrap_text)
+            for format_key in fields.values()
+        ]
+        return operator.attrgetter(*fields), targets
+
     def write_metadata(
         self,
         file_path: Path,
         metadata: AudioMetadata,
         create_backup: bool = True,
+        audio_file=None,
     ) -> ProcessingResult:
-        """Write metadata to an audio file."""
+        """
+        Write metadata to an audio file.
+
+        audio_file may be the mutagen object already parsed from file_path
+        during extraction, which saves parsing the tags a second time.
+        """
         # Normalize to Path in case a string was passed
         file_path = Path(file_path)
 
@@ -90,8 +184,9 @@ class MutagenWriter(MetadataWriterInterface):
             if create_backup:
                 backup_path = self._create_backup(file_path)
 
-            # Load the audio file
-            audio_file = mutagen.File(str(file_path))
+            # Load the audio file unless the caller already has it parsed
+            if audio_file is None:
+                audio_file = mutagen.File(str(file_path))
             if audio_file is None:
                 return ProcessingResult(
                     success=False,
@@ -113,8 +208,14 @@ class MutagenWriter(MetadataWriterInterface):
             success = self._write_by_format(audio_file, file_format, metadata)
 
             if success:
-                audio_file.save()
-                logger.info(f"Metadata written successfully to: {file_path}")
+                if self._save_pool is not None:
+                    future = self._save_pool.submit(audio_file.save)
+                    with self._pending_lock:
+                        self._pending_saves.append((file_path, future))
+                    logger.debug(f"Metadata save queued for: {file_path}")
+                else:
+                    audio_file.save()
+                    logger.info(f"Metadata written successfully to: {file_path}")
 
                 result = ProcessingResult(success=True, metadata=metadata)
                 if validation_errors:
@@ -136,6 +237,26 @@ class MutagenWriter(MetadataWriterInterface):
                 backup_path,
             )
 
+    def flush(self) -> Dict[str, str]:
+        """
+        Wait for all queued saves to finish.
+
+        Returns:
+            Dictionary mapping paths whose save failed to the error message
+        """
+        with self._pending_lock:
+            pending, self._pending_saves = self._pending_saves, []
+
+        failures: Dict[str, str] = {}
+        for file_path, future in pending:
+            try:
+                future.result()
+                logger.info(f"Metadata written successfully to: {file_path}")
+            except Exception as e:
+                logger.error(f"Error saving metadata to {file_path}: {e}")
+                failures[str(file_path)] = str(e)
+        return failures
+
     def supports_format(self, file_format: str) -> bool:
         """Check if format is supported for writing."""
         return file_format.lower() in self.supported_formats
@@ -153,7 +274,7 @@ class MutagenWriter(MetadataWriterInterface):
             # MP3 has character encoding limitations
             for field in ['title', 'artist', 'album']:
                 value = getattr(metadata, field, None)
-                if value and len(value.encode('utf-8')) > 255:
+                if value and _utf8_too_long(value, 255):
                     errors.append(f"{field} too long for MP3 format")
 
         elif file_format == 'mp4':
@@ -170,31 +291,78 @@ class MutagenWriter(MetadataWriterInterface):
         """Create a backup of the original file."""
         file_path = Path(file_path)
         backup_path = file_path.with_suffix(file_path.suffix + '.backup')
+        temp_path = None
         try:
-            shutil.copy2(file_path, backup_path)
+            # Copy to a temporary name and rename into place, so an
+            # interrupted copy never leaves a truncated .backup behind
+            fd, temp_name = tempfile.mkstemp(
+                prefix=f'.{file_path.name}.', suffix='.tmp', dir=file_path.parent,
+            )
+            os.close(fd)
+            temp_path = Path(temp_name)
+
+            if not (self._clone_file(file_path, temp_path)
+                    or self._copy_file_range(file_path, temp_path)):
+                shutil.copy2(file_path, temp_path)
+            os.replace(temp_path, backup_path)
             logger.info(f"Backup created: {backup_path}")
             return backup_path
         except Exception as e:
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
             logger.warning(f"Could not create backup for {file_path}: {e}")
             raise MetadataWriteError(
                 f"Backup creation failed: {e}",
                 str(file_path),
             )
 
+    def _clone_file(self, source: Path, destination: Path) -> bool:
+        """Reflink source to destination; False if the filesystem can't."""
+        if not FCNTL_AVAILABLE:
+            return False
+
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            return False
+
+        shutil.copystat(source, destination)
+        return True
+
+    def _copy_file_range(self, source: Path, destination: Path) -> bool:
+        """
+        Copy in the kernel with copy_file_range; False if unsupported.
+
+        Unlike sendfile (used by shutil.copy2), this lets NFS 4.2 and SMB
+        servers copy server-side, so a NAS share never ships the bytes.
+        """
+        if not hasattr(os, 'copy_file_range'):
+            return False
+
+        try:
+            with open(source, 'rb') as src, open(destination, 'wb') as dst:
+                remaining = os.fstat(src.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+        except OSError:
+            return False
+
+        if remaining > 0:
+            return False
+
+        shutil.copystat(source, destination)
+        return True
+
     def _detect_format(self, audio_file) -> str:
         """Detect the audio file format."""
-        if audio_file is None:
-            return 'unknown'
-
-        format_mapping = {
-            'FLAC': 'flac',
-            'MP3': 'mp3',
-            'MP4': 'mp4',
-            'OggVorbis': 'ogg',
-        }
-
-        file_type = type(audio_file).__name__
-        return format_mapping.get(file_type, 'unknown')
+        for file_class, file_format in _FORMAT_DISPATCH:
+            if isinstance(audio_file, file_class):
+                return file_format
+        return 'unknown'
 
     def _write_by_format(
         self,
@@ -203,45 +371,19 @@ class MutagenWriter(MetadataWriterInterface):
         metadata: AudioMetadata,
     ) -> bool:
         """Write metadata based on file format."""
-        if file_format not in self.format_mappings:
+        if file_format not in self._writers:
             logger.warning(f"No format mapping available for: {file_format}")
             return False
 
-        mapping = self.format_mappings[file_format]
+        getter, targets = self._writers[file_format]
 
         try:
-            for standard_key, format_key in mapping.items():
-                value = getattr(metadata, standard_key, None)
-                if value is not None and value != '':
-                    # Handle special cases
-                    if format_key == 'trkn' and file_format == 'mp4':
-                        # MP4 track numbers are stored as tuples
-                        try:
-                            track_num = int(value)
-                            audio_file[format_key] = [(track_num, 0)]
-                        except ValueError:
-                            logger.warning(
-                                f"Invalid track number for MP4: {value}",
-                            )
-                            continue
-                    else:
-                        # Standard string metadata
-                        if isinstance(value, list):
-                            audio_file[format_key] = value
-                        else:
-                            audio_file[format_key] = [str(value)]
-
-            # Add MusicBrainz IDs if available
-            mb_mappings = {
-                'musicbrainz_recording_id': 'MUSICBRAINZ_TRACKID',
-                'musicbrainz_release_id': 'MUSICBRAINZ_ALBUMID',
-                'musicbrainz_artist_id': 'MUSICBRAINZ_ARTISTID',
-            }
-
-            for standard_key, format_key in mb_mappings.items():
-                value = getattr(metadata, standard_key, None)
-                if value:
-                    audio_file[format_key] = [str(value)]
+            for (format_key, wrap), value in zip(targets, getter(metadata)):
+                if value is None or value == '':
+                    continue
+                wrapped = wrap(value)
+                if wrapped is not None:
+                    audio_file[format_key] = wrapped
 
             return True
 
@@ -1,4 +1,7 @@
 import os
+import time
+import shelve
+import functools
 import musicbrainzngs
 import mutagen
 from mutagen.easyid3 import EasyID3
@@ -9,13 +12,57 @@ import re
 # Configure MusicBrainz
 musicbrainzngs.set_useragent("AudiophileNAS_Fixer", "0.1", "http://example.com")
 
+# Search results are kept on disk so re-running over the same folder
+# doesn't wait on the 1 request/second MusicBrainz limit again.
+# Kept next to this script so it doesn't depend on where we're run from.
+SEARCH_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mb_search_cache")
+# MusicBrainz keeps growing, so cached hits are refreshed after a while
+SEARCH_CACHE_TTL = 30 * 24 * 60 * 60
+
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.wav', '.m4a')
+
+# Compiled once; these run for every file in the folder
+LEADING_NUMBER_RE = re.compile(r'^\d+\s*[-_.]?\s*')
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+
 def get_title_from_filename(filename):
     # Remove extension
     name = os.path.splitext(filename)[0]
     # Remove leading numbers (e.g., "01 dasty ho" -> "dasty ho")
-    name = re.sub(r'^\d+\s*[-_.]?\s*', '', name)
+    name = LEADING_NUMBER_RE.sub('', name)
     return name.strip()
 
+def normalize_query(query):
+    # Case, punctuation and spacing don't change the search, so share a key
+    query = PUNCTUATION_RE.sub(' ', query.lower())
+    return WHITESPACE_RE.sub(' ', query).strip()
+
+# Normalized key -> first spelling seen, which is the one sent to MusicBrainz
+_query_spellings = {}
+
+def search_recordings(query):
+    key = normalize_query(query)
+    _query_spellings.setdefault(key, query)
+    return _search_recordings(key)
+
+@functools.lru_cache(maxsize=4096)
+def _search_recordings(key):
+    # Cached on the normalized key only, same as the disk cache
+    query = _query_spellings[key]
+    with shelve.open(SEARCH_CACHE_PATH) as cache:
+        entry = cache.get(key)
+        if isinstance(entry, tuple) and time.time() - entry[0] < SEARCH_CACHE_TTL:
+            return entry[1]
+
+        result = musicbrainzngs.search_recordings(recording=query, limit=10)
+        recordings = result.get('recording-list', [])
+
+        # An empty answer may just mean MusicBrainz hasn't got it yet; ask again next run
+        if recordings:
+            cache[key] = (time.time(), recordings)
+    return recordings
+
 def update_tags(filepath, artist, title):
     try:
         if filepath.lower().endswith('.mp3'):
@@ -44,7 +91,7 @@ def update_tags(filepath, artist, title):
 def interactive_fix(folder_path):
     print(f"🔍 Scanning {folder_path} for files with missing metadata...\n")
     
-    files = [f for f in os.listdir(folder_path) if f.lower().endswith(('.mp3', '.flac', '.wav', '.m4a'))]
+    files = [f for f in os.listdir(folder_path) if f.lower().endswith(AUDIO_EXTENSIONS)]
     
     if not files:
         print("No audio files found in this folder.")
@@ -75,8 +122,7 @@ def interactive_fix(folder_path):
         
         try:
             # 2. Search MusicBrainz
-            result = musicbrainzngs.search_recordings(recording=search_query, limit=10)
-            recordings = result.get('recording-list', [])
+            recordings = search_recordings(search_query)
             
             if not recordings:
                 print("⚠️ No results found.")
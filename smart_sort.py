@@ -1,5 +1,7 @@
 import os
+import errno
 import shutil
+import struct
 import mutagen
 from mutagen.easyid3 import EasyID3
 from mutagen.easymp4 import EasyMP4
@@ -9,11 +11,114 @@ SOURCE_DIR = "downloads"
 READY_DIR = "downloads/ready_to_file"
 NEEDS_WORK_DIR = "downloads/needs_tagging"
 
+# Only these are opened with mutagen; anything else needs work anyway
+AUDIO_EXTENSIONS = ('.flac', '.mp3', '.m4a', '.ogg', '.wav')
+
+# How much of a tag the header fast path will read before handing over to mutagen
+FAST_TAG_READ_LIMIT = 64 * 1024
+
 # Create directories if they don't exist
 os.makedirs(READY_DIR, exist_ok=True)
 os.makedirs(NEEDS_WORK_DIR, exist_ok=True)
 
+def _first_value(text):
+    # Several values in one frame/comment are null separated; mutagen reports the first
+    return text.split('\x00', 1)[0]
+
+def _flac_has_artist_title(f):
+    if f.read(4) != b'fLaC':
+        return False
+    while True:
+        header = f.read(4)
+        if len(header) < 4:
+            return False
+        block_type = header[0] & 0x7F
+        length = int.from_bytes(header[1:], 'big')
+        if block_type == 4:  # VORBIS_COMMENT
+            if length > FAST_TAG_READ_LIMIT:
+                return False
+            block = f.read(length)
+            vendor_length, = struct.unpack_from('<I', block, 0)
+            offset = 4 + vendor_length
+            count, = struct.unpack_from('<I', block, offset)
+            offset += 4
+            found = {}
+            for _ in range(count):
+                comment_length, = struct.unpack_from('<I', block, offset)
+                offset += 4
+                key, _, value = block[offset:offset + comment_length].decode('utf-8').partition('=')
+                offset += comment_length
+                found.setdefault(key.lower(), value)
+            return bool(found.get('artist') and found.get('title'))
+        if header[0] & 0x80:  # last metadata block, no comments
+            return False
+        f.seek(length, os.SEEK_CUR)
+
+def _decode_id3_text(payload):
+    encoding = payload[0]
+    if encoding == 0:
+        return payload[1:].decode('latin-1')
+    if encoding == 1:
+        return payload[1:].decode('utf-16')
+    if encoding == 2:
+        return payload[1:].decode('utf-16-be')
+    return payload[1:].decode('utf-8')
+
+def _mp3_has_artist_title(f):
+    header = f.read(10)
+    if len(header) < 10 or header[:3] != b'ID3' or header[3] not in (3, 4):
+        return False
+    version, flags = header[3], header[5]
+    if flags & 0xC0:  # unsynchronised tag or extended header
+        return False
+    size = int.from_bytes(header[6:10], 'big')
+    size = (size & 0x7F) | (size & 0x7F00) >> 1 | (size & 0x7F0000) >> 2 | (size & 0x7F000000) >> 3
+    tag = f.read(min(size, FAST_TAG_READ_LIMIT))
+
+    found = {}
+    offset = 0
+    while offset + 10 <= len(tag) and len(found) < 2:
+        frame_id = tag[offset:offset + 4]
+        if frame_id[0] == 0:  # padding
+            break
+        frame_size = int.from_bytes(tag[offset + 4:offset + 8], 'big')
+        if version == 4:
+            frame_size = ((frame_size & 0x7F) | (frame_size & 0x7F00) >> 1
+                          | (frame_size & 0x7F0000) >> 2 | (frame_size & 0x7F000000) >> 3)
+        encoded = tag[offset + 9] & (0x4F if version == 4 else 0xE0)
+        start = offset + 10
+        offset = start + frame_size
+        if frame_id in (b'TPE1', b'TIT2') and frame_id not in found:
+            if encoded or offset > len(tag) or frame_size == 0:
+                return False
+            found[frame_id] = _first_value(_decode_id3_text(tag[start:offset]))
+    return bool(found.get(b'TPE1') and found.get(b'TIT2'))
+
+def has_artist_title_fast(filepath):
+    """
+    Look for non-empty artist and title by reading only the tag header.
+
+    True is definitive. False only means "not found this way" (ID3v1-only
+    MP3s, compressed frames, oversized tags...), so mutagen gets the final say.
+    """
+    lower = filepath.lower()
+    try:
+        with open(filepath, 'rb') as f:
+            if lower.endswith('.flac'):
+                return _flac_has_artist_title(f)
+            if lower.endswith('.mp3'):
+                return _mp3_has_artist_title(f)
+    except (OSError, ValueError, struct.error):
+        pass
+    return False
+
 def is_metadata_complete(filepath):
+    if not filepath.lower().endswith(AUDIO_EXTENSIONS):
+        return False
+
+    if has_artist_title_fast(filepath):
+        return True
+
     try:
         # Load file with mutagen
         audio = mutagen.File(filepath, easy=True)
@@ -33,26 +138,36 @@ def is_metadata_complete(filepath):
         print(f"Error checking {filepath}: {e}")
         return False
 
+def move_file(src, dst):
+    # Same filesystem in the usual layout, so a single rename does it;
+    # os.replace overwrites an existing file on Windows too, like shutil.move did
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
 def sort_files():
     print(f"Scanning {SOURCE_DIR}...")
     count_ready = 0
     count_needs_work = 0
     
-    for filename in os.listdir(SOURCE_DIR):
-        filepath = os.path.join(SOURCE_DIR, filename)
-        
-        # Skip directories (like the ones we just created)
-        if os.path.isdir(filepath):
-            continue
-            
-        if is_metadata_complete(filepath):
-            shutil.move(filepath, os.path.join(READY_DIR, filename))
+    # Skip directories (like the ones we just created); the entry type comes
+    # from the directory listing, so this needs no extra stat per file.
+    # Listed up front because files are moved while we go.
+    with os.scandir(SOURCE_DIR) as entries:
+        files = [entry for entry in entries if not entry.is_dir()]
+
+    for entry in files:
+        if is_metadata_complete(entry.path):
+            move_file(entry.path, os.path.join(READY_DIR, entry.name))
             count_ready += 1
-            print(f"[READY] {filename}")
+            print(f"[READY] {entry.name}")
         else:
-            shutil.move(filepath, os.path.join(NEEDS_WORK_DIR, filename))
+            move_file(entry.path, os.path.join(NEEDS_WORK_DIR, entry.name))
             count_needs_work += 1
-            print(f"[NEEDS WORK] {filename}")
+            print(f"[NEEDS WORK] {entry.name}")
 
     print("-" * 30)
     print(f"Sorting Complete!")
@@ -1,5 +1,6 @@
 import importlib.util
 import sys
+import threading
 import types
 from pathlib import Path
 
@@ -12,18 +13,25 @@ SCANNER_PATH = PROJECT_ROOT / "features" / "audio-repair" / "detection" / "scann
 
 def load_scanner(monkeypatch):
     class FakeInterpreter:
-        def __init__(self, model_path=None):
+        def __init__(self, model_path=None, num_threads=None):
             self.model_path = model_path
             self.stored = None
+            self.dtype = np.float32
+            self.quantization = (0.0, 0)
+            self.shape = (1, 128, 128, 1)
 
         def allocate_tensors(self):
             return None
 
+        def resize_tensor_input(self, index, shape):
+            self.resized = self.shape = tuple(shape)
+
         def get_input_details(self):
-            return [{"index": 0}]
+            return [{"index": 0, "shape": np.array(self.shape), "dtype": self.dtype,
+                     "quantization": self.quantization}]
 
         def get_output_details(self):
-            return [{"index": 0}]
+            return [{"index": 0, "dtype": self.dtype, "quantization": self.quantization}]
 
         def set_tensor(self, index, value):
             self.stored = value
@@ -32,7 +40,9 @@ def load_scanner(monkeypatch):
             return None
 
         def get_tensor(self, index):
-            return np.array([[0.25]], dtype=np.float32)
+            if self.dtype == np.float32:
+                return np.full((len(self.stored), 1), 0.25, dtype=np.float32)
+            return np.full((len(self.stored), 1), 64, dtype=self.dtype)
 
     fake_tflite_mod = types.SimpleNamespace(Interpreter=FakeInterpreter)
     monkeypatch.setitem(sys.modules, "tflite_runtime.interpreter", fake_tflite_mod)
@@ -55,6 +65,72 @@ def test_audio_predictor_predict(monkeypatch, tmp_path):
     assert 0 <= score <= 1
 
 
+def test_audio_predictor_predict_batch_scores_in_one_invoke(monkeypatch, tmp_path):
+    scanner = load_scanner(monkeypatch)
+
+    model_path = tmp_path / "model.tflite"
+    model_path.write_bytes(b"")
+    predictor = scanner.AudioPredictor(str(model_path))
+    monkeypatch.setattr(predictor, "preprocess", lambda path: None if "broken" in str(path)
+                        else np.full((1, 128, 128, 1), 0.5, dtype=np.float32))
+
+    scores = predictor.predict_batch(["a.wav", "broken.wav", "b.wav"])
+
+    assert scores == [0.25, 1.0, 0.25]
+    assert predictor.interpreter.resized == (2, 128, 128, 1)
+    assert predictor.interpreter.stored.shape == (2, 128, 128, 1)
+
+
+def test_audio_predictor_predict_after_batch_resizes_back(monkeypatch, tmp_path):
+    scanner = load_scanner(monkeypatch)
+
+    model_path = tmp_path / "model.tflite"
+    model_path.write_bytes(b"")
+    predictor = scanner.AudioPredictor(str(model_path))
+    monkeypatch.setattr(predictor, "preprocess", lambda path: np.full((1, 128, 128, 1), 0.5, dtype=np.float32))
+
+    predictor.predict_batch(["a.wav", "b.wav"])
+    score = predictor.predict("c.wav")
+
+    assert score == 0.25
+    assert predictor.interpreter.resized == (1, 128, 128, 1)
+    assert predictor.interpreter.stored.shape == (1, 128, 128, 1)
+
+
+def test_audio_predictor_quantizes_for_uint8_model(monkeypatch, tmp_path):
+    scanner = load_scanner(monkeypatch)
+
+    model_path = tmp_path / "model.tflite"
+    model_path.write_bytes(b"")
+    predictor = scanner.AudioPredictor(str(model_path))
+    predictor.interpreter.dtype = np.uint8
+    predictor.interpreter.quantization = (1 / 256, 0)
+    predictor._runner().input_details = predictor.interpreter.get_input_details()
+    predictor._runner().output_details = predictor.interpreter.get_output_details()
+    monkeypatch.setattr(predictor, "preprocess", lambda path: np.full((1, 128, 128, 1), 0.5, dtype=np.float32))
+
+    score = predictor.predict("a.wav")
+
+    assert predictor.interpreter.stored.dtype == np.uint8
+    assert predictor.interpreter.stored.max() == 128
+    assert score == 0.25
+
+
+def test_audio_predictor_uses_one_interpreter_per_thread(monkeypatch, tmp_path):
+    scanner = load_scanner(monkeypatch)
+
+    model_path = tmp_path / "model.tflite"
+    model_path.write_bytes(b"")
+    predictor = scanner.AudioPredictor(str(model_path))
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(predictor.interpreter))
+    worker.start()
+    worker.join()
+
+    assert seen[0] is not predictor.interpreter
+    assert predictor.interpreter is predictor.interpreter
+
+
 def test_new_file_handler_clean_file(monkeypatch, tmp_path):
     scanner = load_scanner(monkeypatch)
 
@@ -112,6 +188,15 @@ def test_new_file_handler_dirty_file_with_quarantine(monkeypatch, tmp_path):
         def update_status(self, filepath, col, status):
             self.updated.append((filepath, col, status))
 
+        def content_key(self, filepath):
+            return "key"
+
+        def repair_outcome(self, content_key):
+            return None
+
+        def record_repair(self, content_key, outcome):
+            return None
+
     class DirtyPredictor:
         def predict(self, filepath):
             return 0.9
@@ -142,3 +227,41 @@ def test_new_file_handler_dirty_file_with_quarantine(monkeypatch, tmp_path):
     assert any(col == "repair_status" and status == "NEEDED" for _, col, status in fake_db.updated)
     assert repair_service.calls  # repair attempted
     assert any(status == "FIXED" for _, col, status in fake_db.updated if col == "repair_status")
+
+
+def test_known_unfixable_file_skips_repair(monkeypatch, tmp_path):
+    scanner = load_scanner(monkeypatch)
+
+    monkeypatch.setattr(scanner, "DB_PATH", str(tmp_path / "scan_history.db"))
+    monkeypatch.setattr(scanner, "QUARANTINE_DIR", str(tmp_path / "quarantine"))
+
+    class DirtyPredictor:
+        def predict(self, filepath):
+            return 0.9
+
+    class FailingRepairService:
+        def __init__(self):
+            self.calls = []
+
+        def repair_file(self, filepath):
+            self.calls.append(filepath)
+            return None
+
+    db = scanner.Database()
+    repair_service = FailingRepairService()
+    handler = scanner.NewFileHandler(db, DirtyPredictor(), repair_service=repair_service)
+
+    first = tmp_path / "noisy.wav"
+    first.write_bytes(b"damaged audio")
+    handler.process_file(str(first))
+
+    # The same bytes arriving again under another name
+    second = tmp_path / "noisy copy.wav"
+    second.write_bytes(b"damaged audio")
+    handler.process_file(str(second))
+
+    assert len(repair_service.calls) == 1
+    status = db.conn.execute(
+        "SELECT repair_status FROM scans WHERE filepath = ?", (str(second),)
+    ).fetchone()[0]
+    assert status == "UNFIXABLE"
@@ -29,3 +29,14 @@ def test_parse_with_album_and_encoding_fix():
     assert metadata.artist == "Günther"
     assert metadata.title == "Häuser"
     assert metadata.album == "Greatest Hits"
+
+
+def test_parse_many_keeps_input_order():
+    parser = FilenameParser()
+    names = ["01 Artist - Track Name.flac", Path("/music/02 Other_-_Song.mp3"), "Track - HГ¤user.wav"]
+
+    batch = parser.parse_many(names)
+
+    assert [m.track_number for m in batch] == ["01", "02", None]
+    assert [m.title for m in batch] == ["Track Name", "Song", "Track"]
+    assert batch[2].artist == "Häuser"
@@ -56,3 +56,45 @@ def test_extract_metadata_uses_mutagen(monkeypatch, tmp_path):
     assert metadata.file_info.file_format == "flac"
     assert metadata.file_info.duration == pytest.approx(123.4)
     assert metadata.file_info.sample_rate == 44100
+
+
+def test_extract_musicbrainz_ids_from_id3_and_mp4_frames():
+    from mutagen.id3 import TIT2, TXXX, UFID
+    from mutagen.mp4 import MP4FreeForm
+
+    mp.MUTAGEN_AVAILABLE = True
+    parser = mp.MetadataParser()
+
+    id3_tags = {
+        "TIT2": TIT2(encoding=3, text=["Tagged Title"]),
+        "UFID:http://musicbrainz.org": UFID(owner="http://musicbrainz.org", data=b"rec-id"),
+        "TXXX:MusicBrainz Album Id": TXXX(encoding=3, desc="MusicBrainz Album Id", text=["rel-id"]),
+    }
+    mp4_tags = {
+        "----:com.apple.iTunes:MusicBrainz Track Id": [MP4FreeForm(b"rec-id")],
+        "----:com.apple.iTunes:MusicBrainz Artist Id": [MP4FreeForm(b"art-id")],
+    }
+
+    mp3_metadata = parser._extract_by_format(id3_tags, "mp3")
+    mp4_metadata = parser._extract_by_format(mp4_tags, "mp4")
+
+    assert mp3_metadata.title == "Tagged Title"
+    assert mp3_metadata.musicbrainz_recording_id == "rec-id"
+    assert mp3_metadata.musicbrainz_release_id == "rel-id"
+    assert mp4_metadata.musicbrainz_recording_id == "rec-id"
+    assert mp4_metadata.musicbrainz_artist_id == "art-id"
+
+
+def test_generic_extraction_reads_id3_frames():
+    from mutagen.id3 import TIT2, TPE1
+
+    mp.MUTAGEN_AVAILABLE = True
+    parser = mp.MetadataParser()
+
+    metadata = parser._extract_generic({
+        "TIT2": TIT2(encoding=3, text=["Frame Title"]),
+        "TPE1": TPE1(encoding=3, text=["Frame Artist"]),
+    })
+
+    assert metadata.title == "Frame Title"
+    assert metadata.artist == "Frame Artist"
@@ -1,3 +1,4 @@
+import asyncio
 import sys
 from pathlib import Path
 
@@ -38,6 +39,12 @@ class StubFileService:
         self.write_calls += 1
         return ProcessingResult(success=True, metadata=metadata)
 
+    def extract_metadata_batch(self, file_paths, max_workers=None):
+        return [self.extract_metadata(file_path) for file_path in file_paths]
+
+    def write_metadata_batch(self, items, max_workers=None):
+        return [self.write_metadata(file_path, metadata) for file_path, metadata in items]
+
 
 class StubMusicBrainzService:
     def search_metadata(self, metadata: AudioMetadata):
@@ -68,3 +75,84 @@ def test_process_file_completes_metadata_and_writes():
     assert result.metadata.track_number == "01"
     assert result.metadata.source.endswith("musicbrainz")
     assert file_service.write_calls == 1
+
+
+def test_aprocess_batch_returns_result_per_file():
+    service = MetadataService(file_service=StubFileService(), musicbrainz_service=StubMusicBrainzService())
+    paths = [Path("one.flac"), Path("two.flac"), Path("three.flac")]
+
+    results = asyncio.run(service.aprocess_batch(paths, max_concurrency=2))
+
+    assert list(results) == [str(p) for p in paths]
+    assert all(result.success for result in results.values())
+
+
+def test_process_batch_writes_completed_files_in_one_batch():
+    file_service = StubFileService()
+    service = MetadataService(file_service=file_service, musicbrainz_service=StubMusicBrainzService())
+    paths = [Path("one.flac"), Path("two.flac")]
+
+    results = service.process_batch(paths, write_metadata=True)
+
+    assert list(results) == [str(p) for p in paths]
+    assert all(result.success for result in results.values())
+    assert file_service.write_calls == 2
+
+
+class StubAlbumMusicBrainzService:
+    def __init__(self):
+        self.search_calls = 0
+        self.tracks = [
+            AudioMetadata(title=title, artist="Band", album="Record", genre="Rock", date="2020",
+                          track_number=f"{i:02d}", musicbrainz_release_id="rel-1", source="musicbrainz")
+            for i, title in enumerate(["Filename Title", "Second", "Third"], 1)
+        ]
+
+    def search_metadata(self, metadata: AudioMetadata):
+        self.search_calls += 1
+        return [MetadataSearchResult(metadata=self.tracks[0], confidence_score=0.9, source="musicbrainz")]
+
+    def get_release_tracks(self, release_id):
+        return self.tracks
+
+    def match_release_track(self, metadata: AudioMetadata, tracks):
+        for track in tracks:
+            if track.title == metadata.title:
+                return MetadataSearchResult(metadata=track, confidence_score=0.95, source="musicbrainz")
+        return None
+
+
+def test_process_batch_matches_album_tracks_from_one_release_lookup():
+    music_service = StubAlbumMusicBrainzService()
+    service = MetadataService(file_service=StubFileService(), musicbrainz_service=music_service)
+    paths = [Path("album/one.flac"), Path("album/two.flac"), Path("album/three.flac")]
+
+    results = service.process_batch(paths)
+
+    assert music_service.search_calls == 1
+    assert all(result.metadata.album == "Record" for result in results.values())
+
+
+class StubLookupMusicBrainzService(StubMusicBrainzService):
+    def __init__(self):
+        self.lookups = []
+
+    def search_metadata(self, metadata: AudioMetadata):
+        raise AssertionError("tagged files should not be searched")
+
+    def get_detailed_metadata(self, recording_id):
+        self.lookups.append(recording_id)
+        return AudioMetadata(title="MB Title", album="MB Album", musicbrainz_recording_id=recording_id)
+
+
+def test_recording_id_is_looked_up_instead_of_searched():
+    music_service = StubLookupMusicBrainzService()
+    service = MetadataService(file_service=StubFileService(), musicbrainz_service=music_service)
+
+    completed = service._complete_metadata_from_musicbrainz(
+        AudioMetadata(title="Song", musicbrainz_recording_id="rec-1", source="embedded"))
+
+    assert music_service.lookups == ["rec-1"]
+    assert completed.title == "Song"
+    assert completed.album == "MB Album"
+    assert completed.confidence == 1.0
@@ -0,0 +1,253 @@
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+METADATA_ROOT = PROJECT_ROOT / "features" / "audio-repair"
+if str(METADATA_ROOT) not in sys.path:
+    sys.path.insert(0, str(METADATA_ROOT))
+
+from metadata.core.models import AudioMetadata, MetadataSearchResult
+from metadata.services import musicbrainz_service as mb
+from metadata.services.musicbrainz_service import MusicBrainzService
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        return None
+
+    @property
+    def content(self):
+        return json.dumps(self._data).encode("utf-8")
+
+    def json(self):
+        return self._data
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.calls.append({"url": url, "params": dict(params), "headers": dict(headers or {})})
+        return self.responses.pop(0)
+
+
+def make_service(responses, tmp_path, **overrides):
+    config = {
+        "base_url": "https://musicbrainz.test/ws/2/",
+        "user_agent": "AudiophileNAS-tests/1.0",
+        "rate_limit": 1.0,
+        "timeout": 10,
+        "cache_path": str(tmp_path / "mb_cache.db"),
+    }
+    config.update(overrides)
+    service = MusicBrainzService(config)
+    service.session = FakeSession(responses)
+    service._rate_limit_wait = lambda: None
+    return service
+
+
+def test_make_request_serves_fresh_cache_without_network(tmp_path):
+    body = {"recordings": [{"id": "rec-1", "title": "Song"}]}
+    service = make_service([FakeResponse(200, body)], tmp_path)
+
+    first = service._make_request("recording", {"query": 'recording:"Song"'})
+    second = service._make_request("recording", {"query": 'recording:"Song"'})
+
+    assert first == body
+    assert second == body
+    assert len(service.session.calls) == 1
+
+
+def test_make_request_revalidates_with_etag(tmp_path):
+    body = {"recordings": [{"id": "rec-1", "title": "Song"}]}
+    service = make_service([
+        FakeResponse(200, body, {"ETag": '"abc"'}),
+        FakeResponse(304),
+    ], tmp_path, cache_ttl=0)
+
+    first = service._make_request("recording", {"query": 'recording:"Song"'})
+    second = service._make_request("recording", {"query": 'recording:"Song"'})
+
+    assert first == body
+    assert second == body
+    assert "If-None-Match" not in service.session.calls[0]["headers"]
+    assert service.session.calls[1]["headers"]["If-None-Match"] == '"abc"'
+
+
+def test_rate_limit_allows_burst_then_throttles(tmp_path, monkeypatch):
+    service = make_service([], tmp_path, rate_limit=1.0, rate_limit_burst=3)
+    del service._rate_limit_wait  # use the real limiter
+
+    clock = {"now": 100.0}
+    sleeps = []
+    monkeypatch.setattr(mb.time, "monotonic", lambda: clock["now"])
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock["now"] += seconds
+
+    monkeypatch.setattr(mb.time, "sleep", fake_sleep)
+    service._last_refill = clock["now"]
+
+    for _ in range(4):
+        service._rate_limit_wait()
+
+    assert sleeps == [1.0]
+
+
+def test_search_params_include_title_only_alternative(tmp_path):
+    service = make_service([], tmp_path)
+
+    params = service._build_search_params(AudioMetadata(title="Song", artist="Artist"))
+
+    assert params["query"] == '(recording:"Song" AND artist:"Artist") OR recording:"Song"'
+
+
+def test_identical_concurrent_requests_share_one_call(tmp_path):
+    body = {"recordings": [{"id": "rec-1", "title": "Song"}]}
+    service = make_service([FakeResponse(200, body)], tmp_path)
+    release = threading.Event()
+    get = service.session.get
+
+    def slow_get(*args, **kwargs):
+        release.wait(timeout=5)
+        return get(*args, **kwargs)
+
+    service.session.get = slow_get
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            service._make_request("recording", {"query": 'release:"Album"'})))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    while len(service._inflight) == 0:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [body] * 5
+    assert len(service.session.calls) == 1
+
+
+def test_empty_search_is_cached_with_negative_ttl(tmp_path):
+    service = make_service([FakeResponse(200, {"recordings": []})], tmp_path, negative_cache_ttl=60)
+
+    service._make_request("recording", {"query": 'recording:"Unknown"'})
+    cached = service.cache.get(service.cache.make_key("recording", {"query": 'recording:"Unknown"', "fmt": "json"}))
+
+    assert cached.is_fresh()
+    assert cached.expires_at - mb.time.time() <= 60
+
+
+def test_refresh_negatives_bypasses_cached_empty_search(tmp_path):
+    body = {"recordings": [{"id": "rec-1", "title": "Song"}]}
+    service = make_service([
+        FakeResponse(200, {"recordings": []}),
+        FakeResponse(200, body),
+    ], tmp_path)
+
+    service._make_request("recording", {"query": 'recording:"Song"'})
+    service.refresh_negatives = True
+    second = service._make_request("recording", {"query": 'recording:"Song"'})
+
+    assert second == body
+    assert len(service.session.calls) == 2
+
+
+def test_score_candidates_stops_at_near_certain_match(tmp_path):
+    service = make_service([], tmp_path)
+    confidences = {"a": 0.85, "b": 0.97, "c": 0.99}
+    scored = []
+
+    def fake_result(recording, query, query_fields=None):
+        scored.append(recording["id"])
+        return MetadataSearchResult(
+            metadata=AudioMetadata(), confidence_score=confidences[recording["id"]], source="musicbrainz")
+
+    service._recording_to_search_result = fake_result
+    recordings = [{"id": "c", "score": 40}, {"id": "a", "score": 100}, {"id": "b", "score": 90}]
+
+    results = list(service._score_candidates(recordings, AudioMetadata(title="Song")))
+
+    assert scored == ["a", "b"]
+    assert [r.confidence_score for r in results] == [0.85, 0.97]
+
+
+def test_release_tracks_are_matched_locally(tmp_path):
+    release = {
+        "id": "rel-1",
+        "title": "Record",
+        "date": "2020",
+        "artist-credit": [{"name": "Band"}],
+        "media": [{"tracks": [
+            {"position": 1, "title": "Opening", "recording": {"id": "rec-1", "title": "Opening"}},
+            {"position": 2, "title": "Closing", "recording": {"id": "rec-2", "title": "Closing"}},
+        ]}],
+    }
+    service = make_service([FakeResponse(200, release)], tmp_path)
+
+    tracks = service.get_release_tracks("rel-1")
+    match = service.match_release_track(AudioMetadata(title="closing", artist="Band"), tracks)
+
+    assert [t.track_number for t in tracks] == ["01", "02"]
+    assert match.metadata.musicbrainz_recording_id == "rec-2"
+    assert match.metadata.album == "Record"
+    assert match.metadata.artist == "Band"
+
+
+def test_search_params_escape_quotes_in_phrases(tmp_path):
+    service = make_service([], tmp_path)
+
+    params = service._build_search_params(AudioMetadata(title='Say "Hi"'))
+
+    assert params["query"] == 'recording:"Say \\"Hi\\""'
+
+
+
+def test_similarity_fallback_matches_rapidfuzz():
+    pairs = [
+        ("bohemian rhapsody", "bohemian rhapsody (remastered)"),
+        ("the beatles", "beatles"),
+        ("abbcaba", "bbab"),
+        ("queen", "queen"),
+        ("x", "y"),
+    ]
+
+    fallback = [mb._indel_ratio(a, b) for a, b in pairs]
+
+    if mb.RAPIDFUZZ_AVAILABLE:
+        assert fallback == [pytest.approx(mb.fuzz.ratio(a, b) / 100.0) for a, b in pairs]
+    # difflib's SequenceMatcher gives 0.36 here; the LCS "bbab" gives 8/11
+    assert fallback[2] == pytest.approx(8 / 11)
+    assert fallback[3] == 1.0
+    assert fallback[4] == 0.0
+
+
+@pytest.mark.parametrize("rapidfuzz_available", [True, False])
+def test_search_threshold_is_backend_independent(tmp_path, monkeypatch, rapidfuzz_available):
+    if rapidfuzz_available and not mb.RAPIDFUZZ_AVAILABLE:
+        pytest.skip("rapidfuzz not installed")
+    monkeypatch.setattr(mb, "RAPIDFUZZ_AVAILABLE", rapidfuzz_available)
+    service = make_service([], tmp_path)
+
+    query = ("abbcaba", "queen", "")
+    close = service._score_fields(query, ("bbab", "queen", ""))[0]
+    far = service._score_fields(query, ("wxyz", "queen", ""))[0]
+
+    assert close == pytest.approx((8 / 11 * 2.0 + 1.5) / 3.5)
+    assert close >= service.search_threshold
+    assert far < service.search_threshold
@@ -1,9 +1,14 @@
+import io
 import os
 import requests
 import librosa
 import numpy as np
 import random
+import tempfile
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
 
 # --- הגדרות ---
 # רשימת הטווחים המאוכלסים ביותר (מבוסס על FMA GitHub Data)
@@ -15,25 +20,55 @@ VALID_RANGES = [
     (148000, 150000)
 ]
 
-BATCH_SIZE = 20 
+DOWNLOAD_WORKERS = 64  # רוב ה-IDs הם קישורים מתים, אז הזמן הולך על המתנה לרשת
+CPU_WORKERS = os.cpu_count() or 1  # תהליכים לפענוח וספקטרוגרמות
 IMG_SIZE = (128, 128)
 WORKSPACE_DIR = os.path.dirname(os.path.abspath(__file__))
-TEMP_AUDIO_DIR = os.path.join(WORKSPACE_DIR, "temp_audio")
 DATASET_DIR = os.path.join(WORKSPACE_DIR, "dataset_fma_processed") 
+SHARD_SIZE = 512  # זוגות לכל קובץ batch_N.npz במקום שני קבצי npy לכל שיר
+
+# Session אחד עם pool חיבורים, כדי לא לפתוח TCP/TLS מחדש לכל ID
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS))
 
 # יצירת תיקיות
-for d in [TEMP_AUDIO_DIR, os.path.join(DATASET_DIR, "clean"), os.path.join(DATASET_DIR, "noisy")]:
-    os.makedirs(d, exist_ok=True)
+os.makedirs(DATASET_DIR, exist_ok=True)
 
 # --- פונקציות עזר (אותן פונקציות כמו קודם) ---
+FLATNESS_FFT = 2048
+FLATNESS_WINDOW = np.hanning(FLATNESS_FFT + 1)[:-1].astype(np.float32)  # Hann מחזורי, כמו ב-librosa
+
+def spectral_flatness(y):
+    # כמו librosa.feature.spectral_flatness אבל על פריימים בלי חפיפה:
+    # רבע מה-FFTs, ו-rfft אחד וקטורי על כל הפריימים
+    n_frames = len(y) // FLATNESS_FFT
+    frames = y[:n_frames * FLATNESS_FFT].reshape(n_frames, FLATNESS_FFT) * FLATNESS_WINDOW
+    S = np.maximum(1e-10, np.abs(np.fft.rfft(frames, axis=1)) ** 2)
+    return np.mean(np.exp(np.mean(np.log(S), axis=1)) / np.mean(S, axis=1))
+
 def is_valid_music(y, sr):
     try:
         if len(y) / sr < 30: return False, "Short"
-        flatness = np.mean(librosa.feature.spectral_flatness(y=y))
+        flatness = spectral_flatness(y)
         if flatness > 0.4: return False, "Noise/Static"
         return True, "OK"
     except: return False, "Error"
 
+def mel_basis_path(sr):
+    return os.path.join(tempfile.gettempdir(), f"fma_mel_basis_{sr}_2048_{IMG_SIZE[0]}.npy")
+
+def save_mel_basis(sr):
+    # התהליך הראשי שומר את המטריצה פעם אחת לפני שה-workers עולים
+    np.save(mel_basis_path(sr), librosa.filters.mel(sr=sr, n_fft=2048, n_mels=IMG_SIZE[0]))
+
+@lru_cache(maxsize=None)
+def mel_basis(sr):
+    # מטריצת ה-mel נבנית פעם אחת לכל קצב דגימה במקום בכל קריאה.
+    # ב-workers היא ממופה מהקובץ (mmap), כך שכל התהליכים חולקים עותק אחד ב-page cache
+    path = mel_basis_path(sr)
+    if os.path.exists(path): return np.load(path, mmap_mode='r')
+    return librosa.filters.mel(sr=sr, n_fft=2048, n_mels=IMG_SIZE[0])
+
 def audio_to_spec(y, sr):
     try:
         target_len = int(sr * 3.0)
@@ -42,7 +77,9 @@ def audio_to_spec(y, sr):
         else: y_cut = y[:target_len]
         if len(y_cut) < target_len: y_cut = np.pad(y_cut, (0, target_len - len(y_cut)))
         
-        mel = librosa.feature.melspectrogram(y=y_cut, sr=sr, n_mels=IMG_SIZE[0])
+        # כמו librosa.feature.melspectrogram: STFT בהספק ואז מכפלת מטריצות אחת
+        S = np.abs(librosa.stft(y_cut, n_fft=2048, hop_length=512)) ** 2
+        mel = mel_basis(sr) @ S
         mel_db = librosa.power_to_db(mel, ref=np.max)
         min_val, max_val = mel_db.min(), mel_db.max()
         if max_val - min_val == 0: return None
@@ -54,63 +91,144 @@ def audio_to_spec(y, sr):
         return mel_norm
     except: return None
 
+# --- כתיבה בשארדים ---
+def next_shard_index():
+    # ממשיכים אחרי השארד הגבוה הקיים, כך שריצה חוזרת מוסיפה ולא דורסת batch_0.npz וכו'
+    indices = [int(f[6:-4]) for f in os.listdir(DATASET_DIR)
+               if f.startswith("batch_") and f.endswith(".npz") and f[6:-4].isdigit()]
+    return max(indices, default=-1) + 1
+
+_shard = {'clean': [], 'noisy': [], 'names': [], 'index': next_shard_index()}
+
+def add_to_shard(name, spec_clean, spec_noisy):
+    _shard['clean'].append(spec_clean)
+    _shard['noisy'].append(spec_noisy)
+    _shard['names'].append(name)
+    if len(_shard['names']) >= SHARD_SIZE:
+        flush_shard()
+
+def quantize(specs):
+    # הערכים מנורמלים ל-0-1, אז uint8 מספיק לקלט של CNN (המאמן מחלק ב-255)
+    return np.round(np.stack(specs) * 255).astype(np.uint8)
+
+def flush_shard():
+    if not _shard['names']: return
+    # כותבים לשם זמני ומחליפים בסוף: כתיבה שנקטעה לא משאירה npz קטוע ש-train_model ייפול עליו
+    path = os.path.join(DATASET_DIR, f"batch_{_shard['index']}.npz")
+    with open(path + ".tmp", 'wb') as f:
+        np.savez(
+            f,
+            clean=quantize(_shard['clean']),
+            noisy=quantize(_shard['noisy']),
+            names=np.array(_shard['names']),
+        )
+    os.replace(path + ".tmp", path)
+    _shard['index'] += 1
+    for key in ('clean', 'noisy', 'names'):
+        _shard[key] = []
+
 def add_aggressive_noise(audio, sr):
     noise_type = random.choice(['white', 'hum', 'clipping', 'mixed'])
     if noise_type == 'white': return audio + np.random.normal(0, 0.1, audio.shape)
     return audio 
 
-def download_file(track_id):
+def track_url(id_str):
+    return f"https://files.freemusicarchive.org/storage-new/tracks/{id_str}.mp3"
+
+def is_alive(url, session=SESSION):
+    # HEAD בלי גוף: קישור מת עולה סבב אחד, והחיבור חוזר ל-pool במקום להיסגר
+    # (GET עם stream=True שלא נקרא עד הסוף סוגר את החיבור ופותח TLS מחדש)
+    try:
+        r = session.head(url, timeout=2, allow_redirects=False)
+        # הפניה (3xx) היא לא קישור מת: ה-GET עוקב אחריה ובודק את היעד
+        return r.status_code == 200 or r.is_redirect
+    except: return False
+
+def download_file(track_id, session=SESSION):
     id_str = f"{track_id:06d}" 
-    url = f"https://files.freemusicarchive.org/storage-new/tracks/{id_str}.mp3"
+    url = track_url(id_str)
+    if not is_alive(url, session): return None
     try:
         # Timeout קצר מאוד כדי "לרוץ" מהר על קישורים מתים
-        r = requests.get(url, stream=True, timeout=3) 
-        if r.status_code == 200:
-            filename = os.path.join(TEMP_AUDIO_DIR, f"{id_str}.mp3")
-            with open(filename, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            if os.path.getsize(filename) > 50000: return filename
-            else: os.remove(filename)
+        # stream=True: הגוף יורד רק אחרי בדיקת הסטטוס. r.content קורא אותו עד הסוף ואז החיבור חוזר ל-pool;
+        # אם לא קראנו (סטטוס אחר), ה-with סוגר את החיבור ולא מחזיר אותו
+        with session.get(url, stream=True, timeout=3) as r:
+            if r.status_code == 200:
+                # נשאר בזיכרון - אין טעם לכתוב לדיסק קובץ שנמחק מיד אחרי הפענוח
+                data = r.content
+                if len(data) > 50000: return id_str, data
+    except: pass
+    return None
+
+def process_track(name, data):
+    """רץ בתהליך עבודה: פענוח מהזיכרון, בדיקה וספקטרוגרמות. מחזיר None אם נפסל"""
+    try:
+        # פענוח ישירות מהזיכרון (soundfile קורא MP3 מ-libsndfile 1.1)
+        y, sr = librosa.load(io.BytesIO(data), sr=22050, duration=60.0, mono=True)
+        if is_valid_music(y, sr)[0]:
+            spec = audio_to_spec(y, sr)
+            if spec is not None:
+                # רעש
+                spec_noisy = audio_to_spec(add_aggressive_noise(y, sr), sr)
+                if spec_noisy is not None:
+                    return name, spec, spec_noisy
     except: pass
     return None
 
 # --- הלולאה הראשית: רצה רק על הטווחים הידועים ---
-print(f"--- Smart Pipeline Started (Scanning Github verified ranges) ---")
+# producer/consumer: threads מורידים, תהליכים מפענחים, והתהליך הראשי רק כותב שארדים
+if __name__ == "__main__":
+    print(f"--- Smart Pipeline Started (Scanning Github verified ranges) ---")
 
-current_batch = []
-processed_count = 0
+    processed_count = 0
+    pending = set()
+    save_mel_basis(22050)
 
-for start_range, end_range in VALID_RANGES:
-    print(f"\n>>> Moving to range: {start_range} - {end_range}")
-    
-    for track_id in range(start_range, end_range):
-        print(f"\rID {track_id} | Saved: {processed_count}...", end="")
-        
-        file_path = download_file(track_id)
-        if file_path:
-            current_batch.append(file_path)
-            print(f" [V] Found!")
-        
-        # עיבוד כשהבאץ' מתמלא
-        if len(current_batch) >= BATCH_SIZE:
-            print(f"\nProcessing {len(current_batch)} files...")
-            for f_path in current_batch:
-                try:
-                    y, sr = librosa.load(f_path, sr=22050, duration=60.0, mono=True)
-                    if is_valid_music(y, sr)[0]:
-                        spec = audio_to_spec(y, sr)
-                        if spec is not None:
-                            name = os.path.basename(f_path).replace('.mp3', '')
-                            np.save(os.path.join(DATASET_DIR, "clean", name), spec)
-                            
-                            # רעש
-                            spec_noisy = audio_to_spec(add_aggressive_noise(y, sr), sr)
-                            np.save(os.path.join(DATASET_DIR, "noisy", name), spec_noisy)
-                            processed_count += 1
-                except: pass
-                finally:
-                    if os.path.exists(f_path): os.remove(f_path)
-            current_batch = []
-
-print("\n--- Pipeline Finished! ---")
\ No newline at end of file
+    def collect(done):
+        global processed_count
+        for future in done:
+            result = future.result()
+            if result:
+                add_to_shard(*result)
+                processed_count += 1
+
+    # זוגות שעוד לא נכתבו נשמרים גם אם הריצה נעצרת באמצע (Ctrl+C, שגיאה)
+    try:
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloads, \
+                ProcessPoolExecutor(max_workers=CPU_WORKERS) as decoders:
+            for start_range, end_range in VALID_RANGES:
+                print(f"\n>>> Moving to range: {start_range} - {end_range}")
+
+                # חלון מוגבל: ID חדש נשלח להורדה רק כשיש מקום, ורק כשתור הפענוח לא מלא.
+                # כך בזיכרון יש לכל היותר DOWNLOAD_WORKERS + 2*CPU_WORKERS קבצי MP3
+                # (הורדות שכבר רצות כשהתור התמלא + מה שממתין לפענוח)
+                track_ids = iter(range(start_range, end_range))
+                fetching = {}
+                exhausted = False
+                while True:
+                    while not exhausted and len(fetching) < DOWNLOAD_WORKERS and len(pending) < 2 * CPU_WORKERS:
+                        track_id = next(track_ids, None)
+                        if track_id is None:
+                            exhausted = True
+                            break
+                        fetching[downloads.submit(download_file, track_id)] = track_id
+                    if exhausted and not fetching: break
+
+                    done, _ = wait(set(fetching) | pending, return_when=FIRST_COMPLETED)
+                    for future in done & set(fetching):
+                        track_id = fetching.pop(future)
+                        print(f"\rID {track_id} | Saved: {processed_count}...", end="")
+                        download = future.result()
+                        if download:
+                            pending.add(decoders.submit(process_track, *download))
+                            print(f" [V] Found!")
+
+                    finished = done & pending
+                    pending -= finished
+                    collect(finished)
+
+            collect(wait(pending).done)
+    finally:
+        flush_shard()
+
+    print("\n--- Pipeline Finished! ---")
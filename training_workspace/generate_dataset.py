@@ -2,8 +2,10 @@ import os
 import numpy as np
 import librosa
 import soundfile as sf
+import soxr
 import random
 import shutil
+from numba import njit
 
 # --- הגדרות ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -20,6 +22,45 @@ if os.path.exists(DATASET_DIR):
 os.makedirs(os.path.join(DATASET_DIR, "clean"))
 os.makedirs(os.path.join(DATASET_DIR, "noisy"))
 
+def load_audio(path):
+    """קריאה ישירה עם libsndfile ו-soxr; librosa/audioread רק כשהפורמט לא נתמך (m4a)"""
+    try:
+        y, native_sr = sf.read(path, dtype='float32', always_2d=False)
+    except RuntimeError:  # sf.LibsndfileError: פורמט ש-libsndfile לא מכיר
+        return librosa.load(path, sr=SAMPLE_RATE, mono=True)
+    if y.ndim == 2:
+        y = y.mean(axis=1)
+    if native_sr != SAMPLE_RATE:
+        # אותו resampler שבו librosa.load משתמש כברירת מחדל (soxr_hq)
+        y = soxr.resample(y, native_sr, SAMPLE_RATE, quality='HQ')
+    return y, SAMPLE_RATE
+
+# --- קרנלים של numba: כל סוג רעש במעבר אחד על המערך, בלי מערכי ביניים ---
+# (רעש לבן נשאר ב-np.random.normal הווקטורי - הוא מהיר יותר מהגרלה לכל דגימה ב-numba)
+@njit(cache=True, fastmath=True)
+def _hum(audio, amplitude, freq, sr):
+    # אותו t כמו np.linspace(0, n/sr, n), בלי להקצות אותו
+    n = audio.size
+    step = (n / sr) / (n - 1) if n > 1 else 0.0
+    out = np.empty_like(audio)
+    for i in range(n):
+        out[i] = audio[i] + amplitude * np.sin(2 * np.pi * freq * i * step)
+    return out
+
+@njit(cache=True, fastmath=True)
+def _clip_gain(audio, factor, limit):
+    out = np.empty_like(audio)
+    for i in range(audio.size):
+        out[i] = min(max(audio[i] * factor, -limit), limit)
+    return out
+
+@njit(cache=True)
+def _dropouts(audio, starts, lengths):
+    out = audio.copy()
+    for k in range(starts.size):
+        out[starts[k]:starts[k] + lengths[k]] = 0
+    return out
+
 def add_aggressive_noise(audio):
     """הוספת רעש אגרסיבית עם לוגים"""
     noise_type = random.choice(['white', 'hum', 'clipping', 'dropout', 'mixed'])
@@ -30,37 +71,42 @@ def add_aggressive_noise(audio):
         return audio + noise, "White Noise"
         
     elif noise_type == 'hum':
-        t = np.linspace(0, len(audio)/SAMPLE_RATE, len(audio))
-        hum = random.uniform(0.1, 0.4) * np.sin(2 * np.pi * 50 * t) # המהום חזק
-        return audio + hum, "50Hz Hum"
+        amplitude = random.uniform(0.1, 0.4) # המהום חזק
+        return _hum(audio, amplitude, 50.0, SAMPLE_RATE), "50Hz Hum"
         
     elif noise_type == 'clipping':
         factor = random.uniform(5.0, 15.0) 
-        return np.clip(audio * factor, -0.6, 0.6), "Hard Clipping"
+        return _clip_gain(audio, factor, 0.6), "Hard Clipping"
 
     elif noise_type == 'dropout':
-        modified = audio.copy()
-        for _ in range(random.randint(3, 8)): # הרבה חורים
-            start = random.randint(0, len(audio) - 2000)
-            length = random.randint(1000, 5000)
-            modified[start : start + length] = 0
-        return modified, "Dropouts"
+        holes = random.randint(3, 8) # הרבה חורים
+        starts = np.random.randint(0, len(audio) - 2000 + 1, holes)
+        lengths = np.random.randint(1000, 5000 + 1, holes)
+        return _dropouts(audio, starts, lengths), "Dropouts"
     
     elif noise_type == 'mixed':
         noise = np.random.normal(0, 0.1, audio.shape)
-        return np.clip((audio + noise) * 5.0, -0.8, 0.8), "Mixed Destruction"
+        return _clip_gain(audio + noise, 5.0, 0.8), "Mixed Destruction"
     
     return audio, "None"
 
 files = [f for f in os.listdir(SOURCE_FOLDER) if f.lower().endswith(('mp3', 'flac', 'wav', 'm4a'))]
 print(f"--- [DEBUG] נמצאו {len(files)} קבצי מקור ---")
 
+# קבצים ש-verify_files.py סימן כפגומים/שקטים
+skip_file = os.path.join(SOURCE_FOLDER, ".skip")
+if os.path.exists(skip_file):
+    with open(skip_file, encoding='utf-8') as f:
+        known_bad = set(f.read().splitlines())
+    files = [f for f in files if f not in known_bad]
+    print(f"--- [DEBUG] מדלג על {len(known_bad)} קבצים פגומים (לפי verify_files.py) ---")
+
 count = 0
 skipped_silent = 0
 
 for file_name in files:
     try:
-        y, sr = librosa.load(os.path.join(SOURCE_FOLDER, file_name), sr=SAMPLE_RATE, mono=True)
+        y, sr = load_audio(os.path.join(SOURCE_FOLDER, file_name))
         chunk_len = int(DURATION * SAMPLE_RATE)
         
         if len(y) < chunk_len: 
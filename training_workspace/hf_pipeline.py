@@ -1,7 +1,9 @@
 import os
 import numpy as np
 import librosa
-import random
+import torch
+import torchaudio
+from torch.utils.data import DataLoader
 from datasets import load_dataset
 
 # --- הגדרות היעד ---
@@ -13,42 +15,111 @@ TOTAL_SPEECH_TARGET = 2000 # יעד דיבור
 IMG_SIZE = (128, 128)
 WORKSPACE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATASET_DIR = os.path.join(WORKSPACE_DIR, "dataset_hf_processed")
+SHARD_SIZE = 512  # זוגות לכל קובץ batch_N.npz במקום שני קבצי npy לכל דוגמה
 
-for d in [os.path.join(DATASET_DIR, "clean"), os.path.join(DATASET_DIR, "noisy")]:
-    os.makedirs(d, exist_ok=True)
+os.makedirs(DATASET_DIR, exist_ok=True)
+
+# --- כתיבה בשארדים ---
+def next_shard_index():
+    # ממשיכים אחרי השארד הגבוה הקיים, כך שריצה חוזרת מוסיפה ולא דורסת batch_0.npz וכו'
+    indices = [int(f[6:-4]) for f in os.listdir(DATASET_DIR)
+               if f.startswith("batch_") and f.endswith(".npz") and f[6:-4].isdigit()]
+    return max(indices, default=-1) + 1
+
+_shard = {'clean': [], 'noisy': [], 'names': [], 'index': next_shard_index()}
+
+def add_to_shard(name, spec_clean, spec_noisy):
+    _shard['clean'].append(spec_clean)
+    _shard['noisy'].append(spec_noisy)
+    _shard['names'].append(name)
+    if len(_shard['names']) >= SHARD_SIZE:
+        flush_shard()
+
+def quantize(specs):
+    # הערכים מנורמלים ל-0-1, אז uint8 מספיק לקלט של CNN (המאמן מחלק ב-255)
+    return np.round(np.stack(specs) * 255).astype(np.uint8)
+
+def flush_shard():
+    if not _shard['names']: return
+    # כותבים לשם זמני ומחליפים בסוף: כתיבה שנקטעה לא משאירה npz קטוע ש-train_model ייפול עליו
+    path = os.path.join(DATASET_DIR, f"batch_{_shard['index']}.npz")
+    with open(path + ".tmp", 'wb') as f:
+        np.savez(
+            f,
+            clean=quantize(_shard['clean']),
+            noisy=quantize(_shard['noisy']),
+            names=np.array(_shard['names']),
+        )
+    os.replace(path + ".tmp", path)
+    _shard['index'] += 1
+    for key in ('clean', 'noisy', 'names'):
+        _shard[key] = []
 
 # --- פונקציות עיבוד משודרגות ---
-def create_spectrogram(y, sr):
-    try:
-        mel = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=IMG_SIZE[0])
-        mel_db = librosa.power_to_db(mel, ref=np.max)
-        
+DEVICE = 'cuda' if torch.cuda.is_available() else 'cpu'
+_MEL_TRANSFORMS = {}
+
+def get_mel_transform(sr):
+    # טרנספורם אחד לכל קצב דגימה; אותם פרמטרים כמו ברירת המחדל של librosa
+    if sr not in _MEL_TRANSFORMS:
+        _MEL_TRANSFORMS[sr] = torchaudio.transforms.MelSpectrogram(
+            sample_rate=sr, n_fft=2048, hop_length=512, n_mels=IMG_SIZE[0],
+            power=2.0, norm='slaney', mel_scale='slaney', pad_mode='constant',
+        ).to(DEVICE)
+    return _MEL_TRANSFORMS[sr]
+
+def create_spectrograms(chunks, sr):
+    """
+    ספקטרוגרמות לכל החתיכות של קובץ במעבר אחד (N, samples) על ה-GPU אם יש.
+    מחזיר מערך (N, 128, 128) ומסכה של חתיכות תקינות.
+    """
+    with torch.no_grad():
+        x = torch.from_numpy(np.ascontiguousarray(chunks, dtype=np.float32)).to(DEVICE)
+        mel = get_mel_transform(sr)(x)
+
+        # power_to_db(ref=np.max) עם top_db=80, לכל חתיכה בנפרד
+        mel_db = 10.0 * torch.log10(torch.clamp(mel, min=1e-10))
+        max_val = mel_db.amax(dim=(1, 2), keepdim=True)
+        mel_db = torch.maximum(mel_db, max_val - 80.0)
+
         # נרמול 0-1
-        min_val, max_val = mel_db.min(), mel_db.max()
-        if max_val - min_val == 0: return None
-        mel_norm = (mel_db - min_val) / (max_val - min_val)
-        
+        min_val = mel_db.amin(dim=(1, 2), keepdim=True)
+        spread = max_val - min_val
+        valid = (spread > 0).flatten() & torch.isfinite(mel_db).all(dim=2).all(dim=1)
+        mel_norm = (mel_db - min_val) / torch.where(spread > 0, spread, torch.ones_like(spread))
+
         # התאמת גודל
-        if mel_norm.shape[1] > IMG_SIZE[1]: mel_norm = mel_norm[:, :IMG_SIZE[1]]
-        else: mel_norm = np.pad(mel_norm, ((0,0), (0, IMG_SIZE[1] - mel_norm.shape[1])))
-        return mel_norm
-    except: return None
-
-def add_aggressive_noise(audio, sr):
-    noise_type = random.choice(['white', 'hum', 'clipping', 'dropout', 'mixed'])
-    if noise_type == 'white': return audio + np.random.normal(0, 0.1, audio.shape)
-    elif noise_type == 'hum':
-        t = np.linspace(0, len(audio)/sr, len(audio))
-        return audio + (0.3 * np.sin(2 * np.pi * 50 * t))
-    elif noise_type == 'clipping': return np.clip(audio * 10.0, -0.6, 0.6)
-    elif noise_type == 'dropout':
-        mod = audio.copy()
-        start = random.randint(0, len(audio)-2000)
-        mod[start:start+2000] = 0 
-        return mod
-    elif noise_type == 'mixed': 
-        return np.clip((audio + np.random.normal(0, 0.05, audio.shape)) * 4.0, -0.8, 0.8)
-    return audio
+        if mel_norm.shape[2] > IMG_SIZE[1]: mel_norm = mel_norm[:, :, :IMG_SIZE[1]]
+        else: mel_norm = torch.nn.functional.pad(mel_norm, (0, IMG_SIZE[1] - mel_norm.shape[2]))
+        return mel_norm.cpu().numpy(), valid.cpu().numpy()
+
+NOISE_TYPES = ['white', 'hum', 'clipping', 'dropout', 'mixed']
+
+def add_aggressive_noise(chunks, sr):
+    """
+    רעש לכל החתיכות (N, samples) בבת אחת: מגרילים סוג לכל חתיכה מראש,
+    ומפעילים כל סוג פעם אחת על כל השורות שלו - 5 פעולות וקטוריות במקום N קריאות.
+    """
+    noisy = chunks.astype(np.float32)
+    n, length = noisy.shape
+    types = np.random.randint(0, len(NOISE_TYPES), n)
+    rows = {name: np.flatnonzero(types == k) for k, name in enumerate(NOISE_TYPES)}
+
+    white = rows['white']
+    noisy[white] += np.random.normal(0, 0.1, (len(white), length))
+
+    t = np.linspace(0, length / sr, length)
+    noisy[rows['hum']] += 0.3 * np.sin(2 * np.pi * 50 * t)
+
+    noisy[rows['clipping']] = np.clip(noisy[rows['clipping']] * 10.0, -0.6, 0.6)
+
+    dropout = rows['dropout']
+    starts = np.random.randint(0, length - 2000 + 1, len(dropout))
+    noisy[dropout[:, None], starts[:, None] + np.arange(2000)] = 0
+
+    mixed = rows['mixed']
+    noisy[mixed] = np.clip((noisy[mixed] + np.random.normal(0, 0.05, (len(mixed), length))) * 4.0, -0.8, 0.8)
+    return noisy
 
 def process_file_chunks(audio_array, sr, filename_prefix, global_counter, limit):
     """
@@ -62,72 +133,89 @@ def process_file_chunks(audio_array, sr, filename_prefix, global_counter, limit)
     
     # חותכים בחפיפה קלה או ברצף. נלך על רצף.
     created_here = 0
-    
-    # רצים על הקובץ בקפיצות של 3 שניות
-    for i in range(0, total_samples - chunk_samples, chunk_samples):
+    n_chunks = len(range(0, total_samples - chunk_samples, chunk_samples))
+    if n_chunks == 0 or global_counter >= limit:
+        return global_counter
+
+    # כל החתיכות של 3 שניות כמטריצה אחת, וגרסה רועשת לכל אחת
+    chunks = audio_array[:n_chunks * chunk_samples].reshape(n_chunks, chunk_samples)
+    noisy_chunks = add_aggressive_noise(chunks, sr)
+
+    # 1+2. ספקטרוגרמות נקיות ורועשות בקריאה אחת
+    specs, valid = create_spectrograms(np.concatenate([chunks, noisy_chunks]), sr)
+    specs_clean, specs_noisy = specs[:n_chunks], specs[n_chunks:]
+    valid_clean, valid_noisy = valid[:n_chunks], valid[n_chunks:]
+
+    for i in range(n_chunks):
         if global_counter >= limit: break
-        
-        chunk = audio_array[i : i + chunk_samples]
-        
-        # 1. יצירת ספקטרוגרמה נקייה
-        spec_clean = create_spectrogram(chunk, sr)
-        if spec_clean is not None:
-            name = f"{filename_prefix}_{global_counter}"
-            
-            # שמירה
-            np.save(os.path.join(DATASET_DIR, "clean", name), spec_clean)
-            
-            # 2. יצירת ספקטרוגרמה רועשת
-            noisy_chunk = add_aggressive_noise(chunk.copy(), sr)
-            spec_noisy = create_spectrogram(noisy_chunk, sr)
-            if spec_noisy is not None:
-                np.save(os.path.join(DATASET_DIR, "noisy", name), spec_noisy)
-                
-                global_counter += 1
-                created_here += 1
-                
+        if not (valid_clean[i] and valid_noisy[i]): continue
+
+        # שמירה (נאסף לשארד ונכתב כל SHARD_SIZE זוגות)
+        add_to_shard(f"{filename_prefix}_{global_counter}", specs_clean[i], specs_noisy[i])
+        global_counter += 1
+        created_here += 1
+
     return global_counter
 
-# --- Main Pipeline ---
-print(f"--- Starting MASSIVE Data Pipeline ---")
-print(f"Target: {TOTAL_MUSIC_TARGET} Music + {TOTAL_SPEECH_TARGET} Speech = {TOTAL_MUSIC_TARGET + TOTAL_SPEECH_TARGET} Samples")
+# --- טעינה מקבילית ---
+def keep_item(item):
+    return item
 
-# 1. Music (GTZAN) - Slicing aggressively
-print("\n>>> Processing Music (GTZAN)...")
-ds_music = load_dataset("sanchit-gandhi/gtzan", split="train", streaming=True)
+def iter_audio(ds):
+    """
+    מעבר על דאטהסט streaming עם workers: הורדה ופענוח האודיו של כל shard
+    רצים בתהליכים נפרדים, והתהליך הראשי רק מחשב ספקטרוגרמות וכותב.
+    """
+    ds = ds.select_columns(["audio"])
+    workers = max(1, min(os.cpu_count() or 1, ds.n_shards))
+    return DataLoader(ds, batch_size=None, num_workers=workers, collate_fn=keep_item)
 
-music_count = 0
-for i, item in enumerate(ds_music):
-    if music_count >= TOTAL_MUSIC_TARGET: break
-    
+# --- Main Pipeline ---
+# (תחת main: ה-workers של DataLoader מייבאים את הסקריפט מחדש ב-spawn)
+if __name__ == "__main__":
+    print(f"--- Starting MASSIVE Data Pipeline ---")
+    print(f"Target: {TOTAL_MUSIC_TARGET} Music + {TOTAL_SPEECH_TARGET} Speech = {TOTAL_MUSIC_TARGET + TOTAL_SPEECH_TARGET} Samples")
+
+    # זוגות שעוד לא נכתבו נשמרים גם אם הריצה נעצרת באמצע (Ctrl+C, שגיאה)
     try:
-        music_count = process_file_chunks(
-            np.array(item['audio']['array']), 
-            item['audio']['sampling_rate'], 
-            "music_gtzan", 
-            music_count, 
-            TOTAL_MUSIC_TARGET
-        )
-        print(f"\rMusic Samples: {music_count}/{TOTAL_MUSIC_TARGET}", end="")
-    except: continue
+        # 1. Music (GTZAN) - Slicing aggressively
+        print("\n>>> Processing Music (GTZAN)...")
+        ds_music = load_dataset("sanchit-gandhi/gtzan", split="train", streaming=True)
 
-# 2. Speech (LibriSpeech)
-print("\n\n>>> Processing Speech (LibriSpeech)...")
-ds_speech = load_dataset("librispeech_asr", "clean", split="train.100", streaming=True)
+        music_count = 0
+        for i, item in enumerate(iter_audio(ds_music)):
+            if music_count >= TOTAL_MUSIC_TARGET: break
+        
+            try:
+                music_count = process_file_chunks(
+                    np.array(item['audio']['array']), 
+                    item['audio']['sampling_rate'], 
+                    "music_gtzan", 
+                    music_count, 
+                    TOTAL_MUSIC_TARGET
+                )
+                print(f"\rMusic Samples: {music_count}/{TOTAL_MUSIC_TARGET}", end="")
+            except: continue
 
-speech_count = 0
-for i, item in enumerate(ds_speech):
-    if speech_count >= TOTAL_SPEECH_TARGET: break
-    
-    try:
-        speech_count = process_file_chunks(
-            np.array(item['audio']['array']), 
-            item['audio']['sampling_rate'], 
-            "speech_libri", 
-            speech_count, 
-            TOTAL_SPEECH_TARGET
-        )
-        print(f"\rSpeech Samples: {speech_count}/{TOTAL_SPEECH_TARGET}", end="")
-    except: continue
+        # 2. Speech (LibriSpeech)
+        print("\n\n>>> Processing Speech (LibriSpeech)...")
+        ds_speech = load_dataset("librispeech_asr", "clean", split="train.100", streaming=True)
+
+        speech_count = 0
+        for i, item in enumerate(iter_audio(ds_speech)):
+            if speech_count >= TOTAL_SPEECH_TARGET: break
+        
+            try:
+                speech_count = process_file_chunks(
+                    np.array(item['audio']['array']), 
+                    item['audio']['sampling_rate'], 
+                    "speech_libri", 
+                    speech_count, 
+                    TOTAL_SPEECH_TARGET
+                )
+                print(f"\rSpeech Samples: {speech_count}/{TOTAL_SPEECH_TARGET}", end="")
+            except: continue
+    finally:
+        flush_shard()
 
-print(f"\n\n--- DONE! You now have {music_count + speech_count} NEW samples on disk. ---")
\ No newline at end of file
+    print(f"\n\n--- DONE! You now have {music_count + speech_count} NEW samples on disk. ---")
\ No newline at end of file
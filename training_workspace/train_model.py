@@ -1,8 +1,12 @@
 import os
+import shutil
+import hashlib
 import numpy as np
 import librosa
+import soundfile as sf
+import soxr
 import tensorflow as tf
-from tensorflow.keras import layers, models, regularizers, callbacks, optimizers
+from tensorflow.keras import layers, models, regularizers, callbacks, optimizers, mixed_precision
 from sklearn.model_selection import train_test_split
 
 # --- הגדרות ---
@@ -10,7 +14,10 @@ WORKSPACE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 # נתיבים לשני מאגרי המידע
 LOCAL_DIR = os.path.join(WORKSPACE_DIR, "dataset")              # הדאטה האישי שלך (WAV)
-HF_DIR = os.path.join(WORKSPACE_DIR, "dataset_hf_processed")    # הדאטה מהאינטרנט (NPY)
+HF_DIR = os.path.join(WORKSPACE_DIR, "dataset_hf_processed")    # הדאטה מהאינטרנט (שארדים batch_N.npz)
+
+# snapshot של tf.data: הספקטרוגרמות המעובדות נשמרות כאן בין ריצות
+SNAPSHOT_DIR = os.path.join(WORKSPACE_DIR, "tf_snapshots")
 
 # נתיב שמירה סופי
 FINAL_MODEL_DIR = os.path.abspath(os.path.join(WORKSPACE_DIR, "..", "features", "audio-repair", "models"))
@@ -19,134 +26,309 @@ FINAL_MODEL_DIR = os.path.abspath(os.path.join(WORKSPACE_DIR, "..", "features",
 IMG_SIZE = (128, 128)
 BATCH_SIZE = 32
 EPOCHS = 40 
+SAMPLES = int(22050 * 3.0)  # 3 שניות ב-22050, כמו בסורק
+# מטריצת ה-mel של librosa (slaney), כקבוע של TF: (1025, 128)
+MEL_MATRIX = tf.constant(librosa.filters.mel(sr=22050, n_fft=2048, n_mels=IMG_SIZE[0]).T)
 
 print(f"--- [ULTIMATE TRAINER] Loading Hybrid Dataset (Local + Web) ---")
 
 # --- פונקציית טעינה היברידית (מטפלת בשני הסוגים) ---
-def load_sample(file_path):
+def read_wav(file_path, duration, sr=22050):
+    # libsndfile ישירות, וקוראים רק את הפריימים הדרושים; resample (soxr, כמו librosa) רק אם צריך
+    with sf.SoundFile(file_path) as f:
+        native_sr = f.samplerate
+        y = f.read(frames=int(native_sr * duration), dtype='float32', always_2d=True).mean(axis=1)
+    if native_sr != sr:
+        y = soxr.resample(y, native_sr, sr, quality='HQ')
+    return y, sr
+
+def load_npy(file_path):
+    # קובץ מעובד מוכן (NPY מהאינטרנט); קבצי WAV עוברים דרך waveform_to_spec.
+    # הסוג נקבע פעם אחת ב-pair_dataset, אז אין כאן בדיקת סיומת
     try:
-        # סוג 1: קובץ מעובד מוכן (NPY מהאינטרנט)
-        if file_path.endswith('.npy'):
-            return np.load(file_path)
-            
-        # סוג 2: קובץ אודיו גולמי (WAV מהמחשב שלך)
-        elif file_path.endswith('.wav'):
-            # טעינה ועיבוד בזמן אמת
-            y, sr = librosa.load(file_path, sr=22050, duration=3.0)
-            target_len = int(22050 * 3.0)
-            if len(y) < target_len: y = np.pad(y, (0, target_len - len(y)))
-            else: y = y[:target_len]
-            
-            mel = librosa.feature.melspectrogram(y=y, sr=sr, n_mels=IMG_SIZE[0])
-            mel_db = librosa.power_to_db(mel, ref=np.max)
-            
-            # נרמול (חובה!)
-            min_val, max_val = mel_db.min(), mel_db.max()
-            if max_val - min_val == 0: return None
-            mel_norm = (mel_db - min_val) / (max_val - min_val)
-            
-            # התאמת גודל
-            if mel_norm.shape[1] > IMG_SIZE[1]: mel_norm = mel_norm[:, :IMG_SIZE[1]]
-            else: mel_norm = np.pad(mel_norm, ((0,0), (0, IMG_SIZE[1] - mel_norm.shape[1])))
-            return mel_norm
-            
-    except: return None
+        return np.load(file_path, mmap_mode='r')
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Skipping {file_path}: {e}")
+        return None
 
-# --- שלב 1: איסוף כל הקבצים ---
-data, labels = [], []
+def list_samples(folder):
+    # scandir מחזיר את הנתיב המלא ואת סוג הרשומה בלי stat או join נוספים
+    with os.scandir(folder) as entries:
+        return [entry.path for entry in entries if entry.is_file()]
+
+def to_uint8(specs):
+    # שארדים חדשים נשמרים כ-uint8 (0-255); ישנים כ-float16 (0-1) - מאחדים ל-uint8
+    # כדי שכל השארדים יישארו בזיכרון בפורמט הדחוס
+    if specs.dtype == np.uint8:
+        return specs
+    return np.round(specs.astype(np.float32) * 255).astype(np.uint8)
+
+def dequantize(spec):
+    return tf.cast(spec, tf.float32) / 255.0
+
+EMPTY_SPEC = np.zeros(IMG_SIZE, dtype=np.float32)
+EMPTY_WAVE = np.zeros(SAMPLES, dtype=np.float32)
+
+def waveform_to_spec(y):
+    """
+    אותה ספקטרוגרמה כמו librosa בסורק, כגרף TF בתוך tf.data (בלי GIL ובלי librosa):
+    STFT ממורכז עם ריפוד אפסים וחלון Hann מחזורי, mel של slaney,
+    power_to_db(ref=max, top_db=80), נרמול 0-1 ו-128 פריימים ראשונים.
+    """
+    y = tf.pad(y, [[1024, 1024]])  # center=True, pad_mode='constant'
+    stft = tf.signal.stft(y, frame_length=2048, frame_step=512, fft_length=2048,
+                          window_fn=tf.signal.hann_window)
+    mel = tf.matmul(tf.square(tf.abs(stft)), MEL_MATRIX)  # (frames, 128)
+
+    mel_db = 10.0 * tf.math.log(tf.maximum(mel, 1e-10)) / tf.math.log(10.0)
+    mel_db = mel_db - tf.reduce_max(mel_db)
+    mel_db = tf.maximum(mel_db, -80.0)
+
+    min_val = tf.reduce_min(mel_db)
+    valid = min_val < 0.0  # המקסימום תמיד 0 אחרי ref=max
+    mel_norm = (mel_db - min_val) / tf.where(valid, -min_val, 1.0)
+    return tf.transpose(mel_norm)[:, :IMG_SIZE[1]], valid
+
+def fit_length(y):
+    if len(y) < SAMPLES: return np.pad(y, (0, SAMPLES - len(y)))
+    return y[:SAMPLES]
+
+def load_wave_pair(clean_path, noisy_path):
+    # רק הפענוח נשאר ב-Python (numpy_function); ה-STFT וה-mel רצים ב-TF
+    try:
+        c_wave, _ = read_wav(clean_path.decode(), duration=3.0)
+        n_wave, _ = read_wav(noisy_path.decode(), duration=3.0)
+    except (RuntimeError, OSError, ValueError) as e:  # sf.LibsndfileError הוא RuntimeError
+        print(f"[WARNING] Skipping pair {clean_path.decode()}: {e}")
+        return EMPTY_WAVE, EMPTY_WAVE, np.array(False)
+    return fit_length(c_wave), fit_length(n_wave), np.array(True)
+
+def load_wave_pair_tf(clean_path, noisy_path):
+    c_wave, n_wave, ok = tf.numpy_function(
+        load_wave_pair, [clean_path, noisy_path], [tf.float32, tf.float32, tf.bool])
+    c_wave.set_shape((SAMPLES,))
+    n_wave.set_shape((SAMPLES,))
+    c_spec, c_valid = waveform_to_spec(c_wave)
+    n_spec, n_valid = waveform_to_spec(n_wave)
+    return c_spec, n_spec, tf.reshape(ok, ()) & c_valid & n_valid
+
+def load_npy_pair(clean_path, noisy_path):
+    # רץ בתוך tf.data (numpy_function), כמה זוגות במקביל
+    c_spec = load_npy(clean_path.decode())
+    n_spec = load_npy(noisy_path.decode())
+    if c_spec is None or n_spec is None:
+        return EMPTY_SPEC, EMPTY_SPEC, np.array(False)
+    return c_spec.astype(np.float32), n_spec.astype(np.float32), np.array(True)
+
+def load_npy_pair_tf(clean_path, noisy_path):
+    c_spec, n_spec, ok = tf.numpy_function(
+        load_npy_pair, [clean_path, noisy_path], [tf.float32, tf.float32, tf.bool])
+    c_spec.set_shape(IMG_SIZE)
+    n_spec.set_shape(IMG_SIZE)
+    ok.set_shape(())
+    return c_spec, n_spec, ok
 
+def to_examples(c_spec, n_spec):
+    # כל זוג הופך לשתי דוגמאות: נקי (0) ורועש (1)
+    return tf.data.Dataset.from_tensor_slices(
+        (tf.stack([c_spec, n_spec])[..., tf.newaxis], tf.constant([0, 1])))
+
+def pair_dataset(file_pairs, shard_pairs, snapshot_dir=None):
+    """
+    זוגות נקי/רועש -> דוגמאות (spec, label). קבצים נטענים ומעובדים בזמן האימון,
+    במקביל לאימון עצמו, במקום שהכל ייטען מראש ל-RAM.
+    snapshot_dir: אם ניתן, הספקטרוגרמות של הקבצים (WAV/NPY) נשמרות שם בין ריצות.
+    """
+    datasets = []
+    clean, noisy = file_pairs
+    # מחלקים לפי סוג פעם אחת, וכל חלק עובר ישר בפונקציית הטעינה שלו (סוג אחר - מדלגים)
+    is_wav = np.array([path.endswith('.wav') for path in clean], dtype=bool)
+    is_npy = np.array([path.endswith('.npy') for path in clean], dtype=bool)
+    for mask, load in ((is_wav, load_wave_pair_tf), (is_npy, load_npy_pair_tf)):
+        if mask.any():
+            ds = tf.data.Dataset.from_tensor_slices((clean[mask], noisy[mask]))
+            ds = ds.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+            datasets.append(ds.filter(lambda c, n, ok: ok).map(lambda c, n, ok: (c, n)))
+    if datasets and snapshot_dir:
+        # רק ענף הקבצים: שם יש פענוח ו-STFT לחסוך. השארדים כבר ב-RAM כ-uint8, ו-snapshot שלהם
+        # היה כותב עותק float32 גדול פי 4 (ומכניס את כל המערך לגרף שנכנס לטביעת האצבע)
+        files_ds = datasets[0]
+        for other in datasets[1:]:
+            files_ds = files_ds.concatenate(other)
+        datasets = [files_ds.snapshot(snapshot_dir, compression='AUTO')]
+    if len(shard_pairs[0]):
+        ds = tf.data.Dataset.from_tensor_slices(shard_pairs)
+        datasets.append(ds.map(lambda c, n: (dequantize(c), dequantize(n)), num_parallel_calls=tf.data.AUTOTUNE))
+
+    ds = datasets[0]
+    for other in datasets[1:]:
+        ds = ds.concatenate(other)
+    return ds.flat_map(to_examples)
+
+def prepare_snapshot(split, *path_lists):
+    # טביעת האצבע של snapshot מכסה רק את הגרף והנתיבים, לא את תוכן הקבצים - ו-generate_dataset.py
+    # כותב מחדש את אותם שמות עם רעש חדש. לכן mtime+גודל של כל קובץ נכנסים לשם התיקייה
+    digest = hashlib.sha256()
+    for paths in path_lists:
+        for path in paths:
+            st = os.stat(path)
+            digest.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode('utf-8'))
+    name = digest.hexdigest()[:16]
+    # snapshots של קבצים ישנים לא ייקראו שוב - מוחקים אותם לפני שנכתב חדש
+    split_dir = os.path.join(SNAPSHOT_DIR, split)
+    if os.path.isdir(split_dir):
+        for old in os.listdir(split_dir):
+            if old != name:
+                shutil.rmtree(os.path.join(split_dir, old), ignore_errors=True)
+    return os.path.join(split_dir, name)
+
+def split_pairs(clean, noisy):
+    if len(clean) == 0:
+        return (clean, noisy), (clean, noisy)
+    c_train, c_test, n_train, n_test = train_test_split(clean, noisy, test_size=0.15, random_state=42)
+    return (c_train, n_train), (c_test, n_test)
+
+# --- שלב 1: איסוף כל הקבצים ---
 # רשימות לקבצים
 files_clean = []
 files_noisy = []
+shard_clean = [np.zeros((0, *IMG_SIZE), dtype=np.uint8)]
+shard_noisy = [np.zeros((0, *IMG_SIZE), dtype=np.uint8)]
 
 # א. הוספת קבצים מקומיים (אם קיימים)
 if os.path.exists(LOCAL_DIR):
-    local_c = [os.path.join(LOCAL_DIR, "clean", f) for f in os.listdir(os.path.join(LOCAL_DIR, "clean"))]
-    local_n = [os.path.join(LOCAL_DIR, "noisy", f) for f in os.listdir(os.path.join(LOCAL_DIR, "noisy"))]
+    local_c = list_samples(os.path.join(LOCAL_DIR, "clean"))
+    local_n = list_samples(os.path.join(LOCAL_DIR, "noisy"))
     files_clean.extend(local_c)
     files_noisy.extend(local_n)
     print(f"[INFO] Source 1 (Local): Found {len(local_c)} clean samples")
 
 # ב. הוספת קבצים מהאינטרנט (אם קיימים)
 if os.path.exists(HF_DIR):
-    hf_c = [os.path.join(HF_DIR, "clean", f) for f in os.listdir(os.path.join(HF_DIR, "clean"))]
-    hf_n = [os.path.join(HF_DIR, "noisy", f) for f in os.listdir(os.path.join(HF_DIR, "noisy"))]
-    files_clean.extend(hf_c)
-    files_noisy.extend(hf_n)
-    print(f"[INFO] Source 2 (Web):   Found {len(hf_c)} clean samples")
+    # פורמט ישן: קובץ npy לכל דוגמה
+    if os.path.isdir(os.path.join(HF_DIR, "clean")):
+        hf_c = list_samples(os.path.join(HF_DIR, "clean"))
+        hf_n = list_samples(os.path.join(HF_DIR, "noisy"))
+        files_clean.extend(hf_c)
+        files_noisy.extend(hf_n)
+        print(f"[INFO] Source 2 (Web):   Found {len(hf_c)} clean samples")
+
+    # פורמט חדש: שארדים, כל אחד עם זוגות נקי/רועש מוכנים - נשארים בזיכרון כ-uint8
+    shards = sorted(f for f in os.listdir(HF_DIR) if f.startswith("batch_") and f.endswith(".npz"))
+    for shard_name in shards:
+        with np.load(os.path.join(HF_DIR, shard_name)) as shard:
+            shard_clean.append(to_uint8(shard['clean']))
+            shard_noisy.append(to_uint8(shard['noisy']))
+    if shards:
+        print(f"[INFO] Source 2 (Web):   Loaded {sum(map(len, shard_clean))} pairs from {len(shards)} shards")
+
+shard_clean = np.concatenate(shard_clean)
+shard_noisy = np.concatenate(shard_noisy)
 
 # איזון הכמויות
 limit = min(len(files_clean), len(files_noisy))
 print(f"[INFO] Total balanced pairs to load: {limit}")
 
-# --- שלב 2: טעינה לזיכרון ---
-print("Loading data... (This might take a minute)")
-for i in range(limit):
-    if i % 1000 == 0 and i > 0: print(f"   Loaded {i} pairs...")
-    
-    # טעינת הזוג (נקי/רועש)
-    c_spec = load_sample(files_clean[i])
-    n_spec = load_sample(files_noisy[i])
-    
-    if c_spec is not None and n_spec is not None:
-        data.extend([c_spec, n_spec])
-        labels.extend([0, 1])
-
-X = np.array(data)[..., np.newaxis]
-y = np.array(labels)
-print(f"[INFO] RAM Loading Complete. Final Shape: {X.shape}")
+# --- שלב 2: pipeline של tf.data ---
+# חלוקה לפי זוגות (לפני הטעינה), כך ששני הצדדים נשארים מאוזנים נקי/רועש
+file_train, file_test = split_pairs(np.array(files_clean[:limit]), np.array(files_noisy[:limit]))
+shard_train, shard_test = split_pairs(shard_clean, shard_noisy)
+print(f"[INFO] Pairs: {len(file_train[0]) + len(shard_train[0])} train, {len(file_test[0]) + len(shard_test[0])} validation")
 
-# חלוקה
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.15, random_state=42, stratify=y)
+# snapshot: האפוק הראשון של הריצה הראשונה כותב את הספקטרוגרמות של הקבצים לדיסק; כל אפוק וכל ריצה
+# אחריו קוראים אותן ישר, בלי פענוח ו-STFT. קבצים אחרים או ששונו -> snapshot חדש במקום הישן
+train_ds = (pair_dataset(file_train, shard_train, prepare_snapshot("train", *file_train))
+            .shuffle(8192, reshuffle_each_iteration=True)
+            .batch(BATCH_SIZE)
+            .prefetch(tf.data.AUTOTUNE))
+val_ds = (pair_dataset(file_test, shard_test, prepare_snapshot("val", *file_test))
+          .batch(BATCH_SIZE)
+          .prefetch(tf.data.AUTOTUNE))
 
 # --- שלב 3: המודל (ULTRA ARCHITECTURE) ---
-model = models.Sequential([
-    layers.Input(shape=(128, 128, 1)),
+# על GPU: חישוב ב-float16 (Tensor Cores, חצי זיכרון לאקטיבציות) עם משקולות ב-float32.
+# על CPU זה רק מאט, אז נשארים ב-float32
+USE_MIXED_PRECISION = bool(tf.config.list_physical_devices('GPU'))
+if USE_MIXED_PRECISION:
+    mixed_precision.set_global_policy('mixed_float16')
+
+def build_model():
+    return models.Sequential([
+        layers.Input(shape=(128, 128, 1)),
     
-    # Block 1
-    layers.Conv2D(32, 3, padding='same', kernel_regularizer=regularizers.l2(0.0001)),
-    layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
+        # Block 1 (ערוץ כניסה אחד - קונבולוציה רגילה; שאר הבלוקים depthwise + pointwise)
+        layers.Conv2D(32, 3, padding='same', kernel_regularizer=regularizers.l2(0.0001)),
+        layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
     
-    # Block 2
-    layers.Conv2D(64, 3, padding='same', kernel_regularizer=regularizers.l2(0.0001)),
-    layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
+        # Block 2
+        layers.SeparableConv2D(64, 3, padding='same', depthwise_regularizer=regularizers.l2(0.0001),
+                               pointwise_regularizer=regularizers.l2(0.0001)),
+        layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
     
-    # Block 3
-    layers.Conv2D(128, 3, padding='same', kernel_regularizer=regularizers.l2(0.0001)),
-    layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
+        # Block 3
+        layers.SeparableConv2D(128, 3, padding='same', depthwise_regularizer=regularizers.l2(0.0001),
+                               pointwise_regularizer=regularizers.l2(0.0001)),
+        layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
     
-    # Block 4 (Deep Feature Extraction)
-    layers.Conv2D(256, 3, padding='same', kernel_regularizer=regularizers.l2(0.0001)),
-    layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
+        # Block 4 (Deep Feature Extraction)
+        layers.SeparableConv2D(256, 3, padding='same', depthwise_regularizer=regularizers.l2(0.0001),
+                               pointwise_regularizer=regularizers.l2(0.0001)),
+        layers.BatchNormalization(), layers.Activation('relu'), layers.MaxPooling2D(2),
     
-    # Summary
-    layers.GlobalAveragePooling2D(),
+        # Summary
+        layers.GlobalAveragePooling2D(),
     
-    # Classifier
-    layers.Dense(256, activation='relu'),
-    layers.Dropout(0.5),
-    layers.Dense(1, activation='sigmoid')
-])
+        # Classifier (ראש קטן: ל-256 ערוצים והחלטה בינארית לא צריך Dense(256) של 65K פרמטרים)
+        layers.Dense(64, activation='relu'),
+        layers.Dropout(0.5),
+        # היציאה ב-float32 כדי שה-sigmoid וה-loss יישארו יציבים
+        layers.Dense(1, activation='sigmoid', dtype='float32')
+    ])
 
-model.compile(optimizer=optimizers.Adam(1e-3), loss='binary_crossentropy', metrics=['accuracy'])
+model = build_model()
+# jit_compile: XLA מאחד Conv+BN+ReLU לקרנלים בודדים
+model.compile(optimizer=optimizers.Adam(1e-3), loss='binary_crossentropy', metrics=['accuracy'],
+              jit_compile=True)
 
 # --- שלב 4: אימון ---
 if not os.path.exists(FINAL_MODEL_DIR): os.makedirs(FINAL_MODEL_DIR)
-checkpoint_path = os.path.join(FINAL_MODEL_DIR, 'audio_quality_ultimate.keras')
+# רק המשקולות: קטן ומהיר בהרבה משמירת .keras מלאה בכל אפוק שמשתפר
+checkpoint_path = os.path.join(FINAL_MODEL_DIR, 'audio_quality_ultimate.weights.h5')
 
 callbacks_list = [
-    callbacks.ModelCheckpoint(checkpoint_path, monitor='val_accuracy', save_best_only=True, verbose=1),
+    callbacks.ModelCheckpoint(checkpoint_path, monitor='val_accuracy', save_best_only=True,
+                              save_weights_only=True, verbose=1),
     callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=3, verbose=1),
     callbacks.EarlyStopping(monitor='val_loss', patience=8, restore_best_weights=True)
 ]
 
 print("\n--- Starting Training ---")
-history = model.fit(X_train, y_train, epochs=EPOCHS, batch_size=BATCH_SIZE, validation_data=(X_test, y_test), callbacks=callbacks_list)
+history = model.fit(train_ds, epochs=EPOCHS, validation_data=val_ds, callbacks=callbacks_list)
 
 # --- שלב 5: המרה ושמירה ---
 print("\n--- Converting to TFLite ---")
-best_model = models.load_model(checkpoint_path)
+# המשקולות של האפוק הטוב ביותר נטענות לתוך המודל החי - בלי לטעון מודל מלא מהדיסק
+model.load_weights(checkpoint_path)
+best_model = model
+if USE_MIXED_PRECISION:
+    # ל-TFLite ממירים עותק float32 נקי של אותו מודל, בלי שכבות ה-Cast של mixed precision
+    mixed_precision.set_global_policy('float32')
+    best_model = build_model()
+    best_model.set_weights(model.get_weights())
 converter = tf.lite.TFLiteConverter.from_keras_model(best_model)
+
+# קוונטיזציה מלאה ל-int8: חצי מרוחב הפס לזיכרון ומסלולי SIMD מהירים ב-CPU.
+# הכניסה והיציאה נשארות uint8, והסורק ממיר לפי ה-scale/zero_point של המודל
+def representative_dataset():
+    # train_ds מעורבב, אז 200 הדוגמאות הראשונות הן מדגם אקראי
+    for spec, _ in train_ds.unbatch().take(200):
+        yield [spec[tf.newaxis]]
+
+converter.optimizations = [tf.lite.Optimize.DEFAULT]
+converter.representative_dataset = representative_dataset
+converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+converter.inference_input_type = tf.uint8
+converter.inference_output_type = tf.uint8
 tflite_model = converter.convert()
 
 tflite_path = os.path.join(FINAL_MODEL_DIR, 'audio_quality.tflite')
@@ -1,46 +1,80 @@
 import os
 import librosa
 import numpy as np
+import soundfile as sf
+from concurrent.futures import ProcessPoolExecutor
 
 # הגדרת נתיבים
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 SOURCE_FOLDER = os.path.join(BASE_DIR, "source_music")
+SKIP_FILE = os.path.join(SOURCE_FOLDER, ".skip")  # הקבצים הבעייתיים, ש-generate_dataset.py ידלג עליהם
 
-print(f"--- בודק תקינות קבצים בתיקייה: {SOURCE_FOLDER} ---")
-
-if not os.path.exists(SOURCE_FOLDER):
-    print("Error: Source folder not found!")
-    exit()
-
-files = [f for f in os.listdir(SOURCE_FOLDER) if f.lower().endswith(('mp3', 'flac', 'wav', 'm4a'))]
-valid_count = 0
-corrupt_count = 0
+def read_first_second(file_path):
+    # libsndfile קורא רק את השנייה הראשונה, בלי resample; librosa רק לפורמט שהוא לא מכיר (m4a)
+    try:
+        with sf.SoundFile(file_path) as f:
+            return f.read(frames=f.samplerate, dtype='float32')
+    except RuntimeError:
+        y, sr = librosa.load(file_path, sr=22050, duration=1.0)
+        return y
 
-for file_name in files:
+def check(file_name):
+    """רץ בתהליך עבודה: מחזיר (שם, סטטוס, פרטי שגיאה)"""
     file_path = os.path.join(SOURCE_FOLDER, file_name)
     try:
         # מנסים לטעון רק שנייה אחת כדי לראות שהקובץ לא שבור
-        y, sr = librosa.load(file_path, sr=22050, duration=1.0)
-        
+        y = read_first_second(file_path)
+
         # בדיקה שהקובץ לא מכיל רק שקט מוחלט (Digital Silence)
         if np.max(np.abs(y)) == 0:
+            return file_name, "silent", None
+        return file_name, "ok", None
+
+    except Exception as e:
+        return file_name, "error", str(e)
+
+# (תחת main: תהליכי העבודה מייבאים את הסקריפט מחדש)
+if __name__ == "__main__":
+    print(f"--- בודק תקינות קבצים בתיקייה: {SOURCE_FOLDER} ---")
+
+    if not os.path.exists(SOURCE_FOLDER):
+        print("Error: Source folder not found!")
+        exit()
+
+    files = [f for f in os.listdir(SOURCE_FOLDER) if f.lower().endswith(('mp3', 'flac', 'wav', 'm4a'))]
+    valid_count = 0
+    corrupt_count = 0
+
+    # כל קובץ נבדק בנפרד, אז מפזרים על כל הליבות; ההדפסה אחרי, לפי סדר הקבצים
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        results = list(pool.map(check, files, chunksize=8))
+
+    for file_name, status, error in results:
+        if status == "ok":
+            print(f"[OK] {file_name}")
+            valid_count += 1
+        elif status == "silent":
             print(f"[WARNING] {file_name} - הקובץ ריק (שקט מוחלט)!")
             corrupt_count += 1
         else:
-            print(f"[OK] {file_name}")
-            valid_count += 1
-            
-    except Exception as e:
-        print(f"[ERROR] {file_name} - קובץ פגום! מומלץ למחוק אותו.")
-        print(f"        Error details: {e}")
-        corrupt_count += 1
-
-print("-" * 30)
-print(f"סיכום בדיקה:")
-print(f"קבצים תקינים: {valid_count}")
-print(f"קבצים בעייתיים: {corrupt_count}")
-
-if corrupt_count == 0:
-    print("\n>>> הכל מעולה! אתה יכול להריץ את generate_dataset.py <<<")
-else:
-    print("\n>>> יש קבצים בעייתיים. אנא מחק אותם לפני יצירת הדאטה <<<")
\ No newline at end of file
+            print(f"[ERROR] {file_name} - קובץ פגום! מומלץ למחוק אותו.")
+            print(f"        Error details: {error}")
+            corrupt_count += 1
+
+    # שומרים את רשימת הבעייתיים, כדי שיצירת הדאטה לא תיפול עליהם שוב בכל ריצה
+    bad_files = [file_name for file_name, status, error in results if status != "ok"]
+    if bad_files:
+        with open(SKIP_FILE, 'w', encoding='utf-8') as f:
+            f.write("\n".join(bad_files) + "\n")
+    elif os.path.exists(SKIP_FILE):
+        os.remove(SKIP_FILE)
+
+    print("-" * 30)
+    print(f"סיכום בדיקה:")
+    print(f"קבצים תקינים: {valid_count}")
+    print(f"קבצים בעייתיים: {corrupt_count}")
+
+    if corrupt_count == 0:
+        print("\n>>> הכל מעולה! אתה יכול להריץ את generate_dataset.py <<<")
+    else:
+        print("\n>>> יש קבצים בעייתיים. אנא מחק אותם לפני יצירת הדאטה <<<")